@@ -0,0 +1,67 @@
+import re
+from functools import wraps
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него остаётся только gzip
+    brotli = None
+
+MIN_LENGTH = 200
+BROTLI_QUALITY = 5
+ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+# Уже сжатые форматы: повторное сжатие тратит CPU и почти ничего не даёт
+COMPRESSED_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff', 'application/zip',
+    'application/gzip', 'application/x-gzip', 'application/pdf',
+)
+
+
+def no_compression(view):
+    """Отключает сжатие ответа view (CompressionMiddleware)."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        response.skip_compression = True
+        return response
+    return wrapper
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Сжатие ответов brotli (если модуль установлен и клиент его
+    принимает) или gzip.
+
+    Не сжимаются ответы view с @no_compression и уже сжатые форматы
+    (картинки, архивы). Потоковые ответы сжимаются gzip-ом средствами
+    GZipMiddleware.
+    """
+
+    def process_response(self, request, response):
+        if getattr(response, 'skip_compression', False):
+            return response
+        if response.get('Content-Type', '').startswith(COMPRESSED_TYPES):
+            return response
+        if (brotli is None or response.streaming
+                or not ACCEPTS_BROTLI.search(
+                    request.META.get('HTTP_ACCEPT_ENCODING', ''))):
+            return super().process_response(request, response)
+        if (len(response.content) < MIN_LENGTH
+                or response.has_header('Content-Encoding')):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli_compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'br'
+        return response
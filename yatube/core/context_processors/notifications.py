@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.notifications import unread_count
+
+
+def unread_notifications(request):
+    """Счётчик непрочитанных уведомлений.
+
+    Значение ленивое: ни сессия, ни кэш не трогаются, если шаблон
+    счётчик не выводит.
+    """
+    def count():
+        user = request.user
+        return unread_count(user) if user.is_authenticated else 0
+
+    return {
+        'unread_notifications': SimpleLazyObject(count)
+    }
@@ -1,7 +1,14 @@
 from datetime import date
 
+from django.utils.functional import SimpleLazyObject
+
+
+def current_year():
+    return date.today().year
+
 
 def year(request):
+    """Год для подвала; вычисляется, только если шаблон его использует."""
     return {
-        'year': date.today().year
+        'year': SimpleLazyObject(current_year)
     }
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class LocalCache:
+    """Кэш в памяти процесса: LRU с ограничением размера и TTL.
+
+    Не разделяется между процессами и не получает их инвалидаций, поэтому
+    годится только для данных, которые допустимо видеть устаревшими в
+    пределах `timeout` секунд. timeout=0 или maxsize=0 отключают кэш.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.timeout > 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < monotonic():
+                del self.data[key]
+                return default
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.data[key] = (monotonic() + self.timeout, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
@@ -0,0 +1,45 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RateLimitCounter
+
+
+def cleanup_sessions(chunk_size, pause=0):
+    """Удаляет истёкшие сессии пачками по `chunk_size`.
+
+    Каждая пачка - отдельный короткий DELETE по первичному ключу, поэтому
+    таблица не блокируется надолго и запись постов и комментариев может
+    вклиниваться между пачками (в SQLite - единственный писатель).
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    get_model_class = getattr(engine.SessionStore, 'get_model_class', None)
+    if get_model_class is None:
+        # Сессии не в БД (signed_cookies, cache) - чистить нечего
+        return 0
+    expired = get_model_class().objects.filter(
+        expire_date__lt=timezone.now())
+    deleted = 0
+    while True:
+        keys = list(
+            expired.values_list('session_key', flat=True)[:chunk_size])
+        if not keys:
+            return deleted
+        deleted += expired.filter(session_key__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def cleanup_ratelimits(chunk_size, pause=0):
+    """Удаляет истёкшие счётчики ограничителя частоты пачками."""
+    expired = RateLimitCounter.objects.filter(expires__lt=timezone.now())
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += RateLimitCounter.objects.filter(pk__in=ids).delete()[0]
+        if pause:
+            time.sleep(pause)
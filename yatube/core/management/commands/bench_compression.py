@@ -0,0 +1,59 @@
+from time import process_time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from django.utils.text import compress_string
+
+from core.compression import brotli, brotli_compress
+from posts.models import Group, Post
+
+
+def measure(compress, content, repeat):
+    started = process_time()
+    for _ in range(repeat):
+        compressed = compress(content)
+    return len(compressed), (process_time() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет размер страниц сайта без сжатия, с gzip и brotli и '
+        'процессорное время сжатия одного ответа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help='Страница для замера (можно указать несколько раз).'
+        )
+
+    def default_urls(self):
+        urls = [reverse('posts:index'), reverse('posts:groups')]
+        group = Group.objects.first()
+        if group is not None:
+            urls.append(reverse('posts:group_list', args=(group.slug,)))
+        post = Post.objects.select_related('author').first()
+        if post is not None:
+            urls.append(
+                reverse('posts:profile', args=(post.author.username,)))
+        return urls
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        codecs = [('gzip', compress_string)]
+        if brotli is not None:
+            codecs.append(('br', brotli_compress))
+        else:
+            self.stdout.write('Модуль brotli не установлен, только gzip.')
+        client = Client()
+        for url in options['urls'] or self.default_urls():
+            content = client.get(url).content
+            self.stdout.write(f'{url}: {len(content)} байт без сжатия')
+            for name, compress in codecs:
+                size, ms = measure(compress, content, repeat)
+                self.stdout.write(
+                    f'  {name:<5} {size:>7} байт '
+                    f'({size / len(content):.0%}), {ms:.3f} мс CPU'
+                )
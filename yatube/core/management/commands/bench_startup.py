@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+STARTUP_CODE = (
+    'import sys\n'
+    'from yatube.wsgi import application\n'
+    'print(",".join(m for m in ("PIL", "debug_toolbar", "dotenv")'
+    ' if m in sys.modules))\n'
+)
+
+
+def parse_importtime(stderr):
+    """Собственное время импорта (мкс), сгруппированное по пакетам."""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    return totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время старта WSGI-приложения в отдельном процессе и '
+        'разбирает вывод python -X importtime по пакетам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', default='yatube.settings_production',
+            help='Профиль настроек для замера.'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15)
+
+    def run_once(self, settings_module):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+        started = perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        elapsed = perf_counter() - started
+        if result.returncode != 0:
+            raise CommandError(result.stderr[-2000:])
+        return elapsed, result.stdout.strip(), result.stderr
+
+    def handle(self, *args, **options):
+        settings_module = options['settings_module']
+        timings, loaded, stderr = [], '', ''
+        for _ in range(options['repeat']):
+            elapsed, loaded, stderr = self.run_once(settings_module)
+            timings.append(elapsed)
+        timings.sort()
+        self.stdout.write(
+            f'{settings_module}: старт за {timings[0] * 1000:.0f} мс '
+            f'(медиана {timings[len(timings) // 2] * 1000:.0f} мс)'
+        )
+        self.stdout.write(
+            'Загружены при старте: ' + (loaded or 'ни PIL, ни debug_toolbar,'
+                                        ' ни dotenv'))
+        totals = parse_importtime(stderr)
+        self.stdout.write('Импорт по пакетам (последний запуск), мс:')
+        ranked = sorted(totals.items(), key=lambda item: -item[1])
+        for package, micros in ranked[:options['top']]:
+            self.stdout.write(f'  {package:<30} {micros / 1000:8.1f}')
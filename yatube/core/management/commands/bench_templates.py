@@ -0,0 +1,70 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import Client
+from django.urls import reverse
+
+from core.profiling import capture_renders
+from core.templating import iter_template_names
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+def timed(func, repeat):
+    started = perf_counter()
+    for _ in range(repeat):
+        func()
+    return (perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет разбор каждого шаблона проекта и отрисовку шаблонов '
+        'страниц сайта на текущих данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help='Страница для замера (можно указать несколько раз).'
+        )
+
+    def default_urls(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('about:author'),
+            reverse('users:login'),
+        ]
+        group = Group.objects.first()
+        if group is not None:
+            urls.append(reverse('posts:group_list', args=(group.slug,)))
+        post = Post.objects.select_related('author').first()
+        if post is not None:
+            urls.append(reverse('posts:post_detail', args=(post.pk,)))
+            urls.append(
+                reverse('posts:profile', args=(post.author.username,)))
+        return urls
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        engine = engines['django'].engine
+        self.stdout.write('Разбор шаблонов, мс:')
+        for name in iter_template_names():
+            source = engine.find_template(name)[0].source
+            ms = timed(lambda: engine.from_string(source), repeat)
+            self.stdout.write(f'  {name:<45} {ms:8.3f}')
+
+        self.stdout.write('Отрисовка страниц (с include и extends), мс:')
+        client = Client()
+        for url in options['urls'] or self.default_urls():
+            with capture_renders() as captured:
+                # ?bench= нет в PAGE_CACHE_QUERY_PARAMS: запрос минует
+                # AnonymousPageCacheMiddleware, и шаблон отрисовывается
+                client.get(url, {'bench': perf_counter()})
+            for template, context in captured:
+                ms = timed(lambda: template.render(context), repeat)
+                self.stdout.write(f'  {url:<25} {template.name:<30} {ms:8.3f}')
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.maintenance import cleanup_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии пачками (вместо одного большого DELETE '
+        'в clearsessions).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.SESSION_CLEANUP_CHUNK_SIZE,
+            help='Сколько сессий удалять за один запрос.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза (сек) между пачками.'
+        )
+
+    def handle(self, *args, **options):
+        deleted = cleanup_sessions(options['chunk_size'], options['pause'])
+        self.stdout.write(f'Удалено истёкших сессий: {deleted}')
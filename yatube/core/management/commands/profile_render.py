@@ -0,0 +1,46 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.profiling import RenderProfile
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Профилирует отрисовку страницы: время каждого шаблона, include и '
+        'контекст-процессора.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', default='/')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--username',
+            help='Профилировать от имени пользователя (шапка для вошедших).'
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        if options['username']:
+            client.force_login(
+                User.objects.get(username=options['username']))
+        profile = RenderProfile()
+        with profile.active():
+            for _ in range(options['repeat']):
+                # ?bench= нет в PAGE_CACHE_QUERY_PARAMS: запрос минует
+                # AnonymousPageCacheMiddleware, и шаблон отрисовывается
+                client.get(options['url'], {'bench': perf_counter()})
+        repeat = options['repeat']
+        self.stdout.write(
+            f'{"шаблон / процессор":<70} {"вызовов":>8} '
+            f'{"полное, мс":>11} {"своё, мс":>9}'
+        )
+        for name, calls, total, own in profile.rows():
+            self.stdout.write(
+                f'{name:<70} {calls / repeat:8.1f} '
+                f'{total / repeat * 1000:11.3f} {own / repeat * 1000:9.3f}'
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templating import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Разбирает и проверяет все шаблоны проекта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='include_all',
+            help='Проверять также шаблоны django.contrib и сторонних пакетов.'
+        )
+
+    def handle(self, *args, **options):
+        loaded, errors = warm_templates(include_all=options['include_all'])
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Ошибок в шаблонах: {len(errors)}')
+        self.stdout.write(f'Шаблонов разобрано без ошибок: {loaded}')
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Ключ')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Запросов')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='Истекает')),
+            ],
+        ),
+    ]
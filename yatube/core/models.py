@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class RateLimitCounter(models.Model):
+    """Счётчик запросов одного окна ограничителя частоты (core.ratelimit).
+
+    Используется, когда общий кэш не умеет атомарный incr
+    (RATELIMIT_STORAGE='db'); истёкшие строки удаляет задача
+    core.cleanup_ratelimits.
+    """
+
+    key = models.CharField('Ключ', max_length=255, unique=True)
+    count = models.PositiveIntegerField('Запросов', default=0)
+    expires = models.DateTimeField('Истекает', db_index=True)
+
+    def __str__(self):
+        return f'{self.key}: {self.count}'
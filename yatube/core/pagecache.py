@@ -0,0 +1,151 @@
+import gzip
+import re
+from hashlib import md5
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+PAGE_KEY = 'pagecache:{family}:{generation}:{path}'
+GENERATION_KEY = 'pagecache:generation:{family}'
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+# Заголовки, которые выставляются заново при отдаче из кэша
+SKIP_HEADERS = {
+    'content-length', 'content-encoding', 'vary', 'set-cookie', 'expires',
+}
+
+
+def family_hash(family):
+    # slug и username в семействе могут содержать символы, недопустимые
+    # в ключах memcached
+    return md5(family.encode()).hexdigest()
+
+
+def generation_key(family):
+    return GENERATION_KEY.format(family=family_hash(family))
+
+
+def get_generation(family):
+    """Текущее поколение семейства страниц.
+
+    Начальное значение - время в мс, а не 1: если ключ поколения вытеснен
+    из кэша, новое поколение не совпадёт со старыми страницами.
+    """
+    key = generation_key(family)
+    generation = cache.get(key)
+    if generation is None:
+        generation = int(time() * 1000)
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def invalidate_pages(families):
+    """Делает устаревшими все закэшированные страницы семейств."""
+    for family in families:
+        try:
+            cache.incr(generation_key(family))
+        except ValueError:
+            cache.set(generation_key(family), int(time() * 1000), None)
+
+
+def page_family(request):
+    """Семейство страницы по имени URL (settings.PAGE_CACHE_FAMILIES) или
+    None, если страница не кэшируется."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    template = settings.PAGE_CACHE_FAMILIES.get(match.view_name)
+    return template and template.format(**match.kwargs)
+
+
+def is_cacheable_request(request):
+    if not settings.PAGE_CACHE_ENABLE or request.method not in (
+            'GET', 'HEAD'):
+        return False
+    # Сессия есть у вошедших (и у тех, у кого есть flash-сообщения);
+    # CSRF-cookie - у видевших форму (вход, регистрация): их страницы
+    # могут содержать токен и не должны попасть в общий кэш или из него
+    for name in (settings.SESSION_COOKIE_NAME, settings.CSRF_COOKIE_NAME,
+                 'messages'):
+        if name in request.COOKIES:
+            return False
+    return set(request.GET) <= set(settings.PAGE_CACHE_QUERY_PARAMS)
+
+
+def page_key(request, family):
+    query = '&'.join(
+        f'{name}={request.GET[name]}' for name in sorted(request.GET))
+    path = md5(f'{request.path_info}?{query}'.encode()).hexdigest()
+    return PAGE_KEY.format(
+        family=family_hash(family),
+        generation=get_generation(family),
+        path=path,
+    )
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header('Content-Encoding')
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+class AnonymousPageCacheMiddleware:
+    """Кэш страниц целиком для анонимных посетителей.
+
+    Стоит до SessionMiddleware: при попадании запрос не доходит ни до
+    сессий, ни до view. Страницы хранятся сжатыми gzip; клиенту, который
+    принимает gzip, тело отдаётся как есть. Ключ включает путь и
+    разрешённые параметры запроса (page, after, sort), а запросы с
+    другими параметрами не кэшируются. Страницы семейства (например,
+    все страницы группы) сбрасываются вместе сменой поколения в
+    invalidate_pages, которую вызывают сигналы записи.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        family = (
+            page_family(request) if is_cacheable_request(request) else None)
+        if family is None:
+            return self.get_response(request)
+        key = page_key(request, family)
+        entry = cache.get(key)
+        if entry is not None:
+            return self.build_response(request, entry)
+        response = self.get_response(request)
+        if not is_cacheable_response(response):
+            return response
+        entry = {
+            'body': compress_string(response.content),
+            'headers': [
+                (name, value) for name, value in response.items()
+                if name.lower() not in SKIP_HEADERS
+            ],
+        }
+        cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+        return self.build_response(request, entry)
+
+    def build_response(self, request, entry):
+        accepts_gzip = ACCEPTS_GZIP.search(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if accepts_gzip:
+            response = HttpResponse(entry['body'])
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(entry['body']))
+        for name, value in entry['headers']:
+            response[name] = value
+        response['Content-Length'] = str(len(response.content))
+        patch_vary_headers(response, ('Cookie', 'Accept-Encoding'))
+        return response
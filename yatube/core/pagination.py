@@ -0,0 +1,175 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder без округления времени до миллисекунд: иначе
+    условие «после курсора» пропускает записи, отличающиеся только
+    микросекундами."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class WindowedPaginator(Paginator):
+    """Paginator с окном номеров страниц и ограничением глубины.
+
+    Страница получает page_window - номера первой и последней страниц
+    и `window` страниц по обе стороны от текущей (None на месте
+    пропуска), чтобы шаблон не выводил весь page_range. Страниц не
+    больше max_pages: более далёкие OFFSET недоступны, запрос за ними
+    отдаёт последнюю доступную страницу. С count_key число записей
+    берётся из кэша, COUNT(*) выполняется только при промахе; свежим
+    значение держат фоновые задачи (см. posts.counters).
+    """
+
+    def __init__(self, object_list, per_page, count_key=None, window=None,
+                 max_pages=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.window = (
+            settings.PAGINATOR_WINDOW if window is None else window)
+        self.max_pages = (
+            settings.PAGINATOR_MAX_PAGES if max_pages is None else max_pages)
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        count = cache.get(self.count_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                self.count_key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    @cached_property
+    def num_pages(self):
+        return min(super().num_pages, self.max_pages)
+
+    def page(self, number):
+        page = super().page(number)
+        page.page_window = self.page_window(page.number)
+        return page
+
+    def page_window(self, number):
+        first = max(number - self.window, 1)
+        last = min(number + self.window, self.num_pages)
+        pages = list(range(first, last + 1))
+        if first > 1:
+            pages[:0] = [1, None] if first > 2 else [1]
+        if last < self.num_pages:
+            pages += (
+                [None, self.num_pages] if last < self.num_pages - 1
+                else [self.num_pages])
+        return pages
+
+
+class KeysetPage:
+    """Страница выборки, полученная по ключу последней записи, без OFFSET."""
+
+    def __init__(self, object_list, next_cursor, is_first):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return not self.is_first
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу сортировки.
+
+    Вместо номера страницы используется курсор - значения полей сортировки
+    последней записи предыдущей страницы. Стоимость запроса не зависит от
+    глубины страницы, т.к. база не пропускает строки через OFFSET.
+    Поля сортировки должны быть полями модели и вместе давать уникальный
+    ключ (последним полем обычно идёт pk).
+    """
+
+    def __init__(self, object_list, ordering, per_page):
+        self.object_list = object_list
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        values = self.decode_cursor(cursor)
+        queryset = self.object_list.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values))
+        items = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(items) > self.per_page:
+            items = items[:self.per_page]
+            next_cursor = self.encode_cursor(items[-1])
+        return KeysetPage(items, next_cursor, is_first=values is None)
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        raw = json.dumps(values, cls=CursorEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Возвращает значения полей из курсора или None для 1-й страницы."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw.decode())
+            if len(values) != len(self.fields):
+                return None
+            model_meta = self.object_list.model._meta
+            return [
+                model_meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, FieldDoesNotExist,
+                ValidationError):
+            return None
+
+    def _after(self, values):
+        """Условие «строго после» курсора для составного ключа сортировки."""
+        condition = Q()
+        for position, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[position]})
+            for prev_position, (prev_name, _) in enumerate(
+                    self.fields[:position]):
+                step &= Q(**{prev_name: values[prev_position]})
+            condition |= step
+        return condition
+
+
+def get_keyset_page(request, object_list, ordering, per_page):
+    paginator = KeysetPaginator(object_list, ordering, per_page)
+    return paginator.get_page(request.GET.get('after'))
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from time import perf_counter
+from unittest import mock
+
+from django.template import engines
+from django.template.base import Template
+
+
+@contextmanager
+def capture_renders():
+    """Перехватывает отрисовку шаблонов верхнего уровня.
+
+    Внутри блока каждый Template.render, вызванный не из другого шаблона
+    (т.е. не include и не extends), добавляется в список как пара
+    (шаблон, контекст) - их можно потом перерисовать отдельно от view.
+    """
+    captured = []
+    original_render = Template.render
+    depth = [0]
+
+    def render(template, context):
+        if depth[0] == 0:
+            captured.append((template, context))
+        depth[0] += 1
+        try:
+            return original_render(template, context)
+        finally:
+            depth[0] -= 1
+
+    with mock.patch.object(Template, 'render', render):
+        yield captured
+
+
+class RenderProfile:
+    """Профиль отрисовки: время по шаблонам (в т.ч. include и extends)
+    и по контекст-процессорам.
+
+    Время шаблона считается «собственным» - без вложенных шаблонов,
+    которые учитываются отдельно, и «полным» - вместе с ними.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._stack = []
+
+    def record(self, name, elapsed, nested):
+        calls, total, own = self.stats.get(name, (0, 0.0, 0.0))
+        self.stats[name] = (calls + 1, total + elapsed, own + elapsed - nested)
+
+    def wrap_template(self, original_render):
+        profile = self
+
+        def _render(template, context):
+            profile._stack.append(0.0)
+            started = perf_counter()
+            try:
+                return original_render(template, context)
+            finally:
+                elapsed = perf_counter() - started
+                nested = profile._stack.pop()
+                if profile._stack:
+                    profile._stack[-1] += elapsed
+                profile.record(template.name or '<string>', elapsed, nested)
+        return _render
+
+    def wrap_processor(self, processor):
+        profile = self
+        name = f'{processor.__module__}.{processor.__name__}'
+
+        def wrapped(request):
+            started = perf_counter()
+            try:
+                return processor(request)
+            finally:
+                elapsed = perf_counter() - started
+                if profile._stack:
+                    profile._stack[-1] += elapsed
+                profile.record(f'[context processor] {name}', elapsed, 0.0)
+        return wrapped
+
+    @contextmanager
+    def active(self):
+        engine = engines['django'].engine
+        processors = engine.template_context_processors
+        engine.__dict__['template_context_processors'] = tuple(
+            self.wrap_processor(processor) for processor in processors)
+        try:
+            with mock.patch.object(
+                    Template, '_render', self.wrap_template(Template._render)):
+                yield self
+        finally:
+            engine.__dict__['template_context_processors'] = processors
+
+    def rows(self):
+        """Строки (имя, вызовы, полное время, собственное время) по
+        убыванию собственного времени."""
+        return sorted(
+            ((name,) + stat for name, stat in self.stats.items()),
+            key=lambda row: -row[3],
+        )
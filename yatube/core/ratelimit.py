@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import RateLimitCounter
+from .views import too_many_requests
+
+RATELIMIT_KEY = 'ratelimit:{group}:{ident}:{window}'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/m' -> (10, 60): число запросов и длина окна в секундах."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period]
+
+
+def client_ident(request):
+    """Пользователь для вошедших, IP-адрес для анонимов."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def incr_cache(key, period):
+    if cache.add(key, 1, period * 2):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ истёк между add и incr
+        cache.add(key, 1, period * 2)
+        return 1
+
+
+def incr_db(key, period, now):
+    """UPDATE count = count + 1, при отсутствии строки - INSERT.
+
+    Прочитанное после UPDATE значение не меньше собственного номера
+    запроса в окне, поэтому параллельные запросы не недосчитываются.
+    """
+    counter = RateLimitCounter.objects.filter(key=key)
+    if not counter.update(count=F('count') + 1):
+        expires = datetime.fromtimestamp(now, timezone.utc) + timedelta(
+            seconds=period * 2)
+        try:
+            with transaction.atomic():
+                RateLimitCounter.objects.create(
+                    key=key, count=1, expires=expires)
+            return 1
+        except IntegrityError:
+            # Строку только что создал параллельный запрос
+            counter.update(count=F('count') + 1)
+    return counter.values_list('count', flat=True).first() or 0
+
+
+def increment(key, period, now):
+    """Атомарно увеличивает счётчик окна и возвращает новое значение.
+
+    RATELIMIT_STORAGE='cache' годится только для кэша с атомарным incr,
+    общего для всех процессов (memcached, redis): в FileBasedCache incr -
+    чтение-изменение-запись, а locmem считает отдельно в каждом воркере.
+    Иначе счётчики хранятся в БД (RateLimitCounter).
+    """
+    if settings.RATELIMIT_STORAGE == 'cache':
+        return incr_cache(key, period)
+    return incr_db(key, period, now)
+
+
+def current_count(key):
+    if settings.RATELIMIT_STORAGE == 'cache':
+        return cache.get(key, 0)
+    return RateLimitCounter.objects.filter(key=key).values_list(
+        'count', flat=True).first() or 0
+
+
+def hit(group, ident, rate, now=None):
+    """Учитывает запрос; возвращает 0, если он в пределах лимита, иначе
+    через сколько секунд можно повторить.
+
+    Скользящее окно приближается двумя фиксированными: счётчик прошлого
+    окна берётся с весом оставшейся в нём доли времени. Счётчик текущего
+    окна увеличивается атомарно (increment), прошлого - только читается.
+    """
+    limit, period = parse_rate(rate)
+    now = time() if now is None else now
+    window, elapsed = divmod(now, period)
+    window = int(window)
+    # Счётчик живёт два окна: в следующем он нужен как «прошлое окно»
+    current = increment(
+        RATELIMIT_KEY.format(group=group, ident=ident, window=window),
+        period, now)
+    if current > limit:
+        return int(period - elapsed) + 1
+    previous = current_count(RATELIMIT_KEY.format(
+        group=group, ident=ident, window=window - 1))
+    weighted = previous * (period - elapsed) / period + current
+    if weighted > limit:
+        return int(period - elapsed) + 1
+    return 0
+
+
+def ratelimit(group, methods=('POST',)):
+    """Ограничивает частоту запросов к view.
+
+    Лимит берётся из settings.RATELIMITS[group] (например, '10/m') при
+    каждом вызове; запросы с методами не из `methods` не учитываются.
+    При превышении возвращается 429 с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMITS.get(group)
+            if (settings.RATELIMIT_ENABLE and rate
+                    and (methods is None or request.method in methods)):
+                retry_after = hit(group, client_ident(request), rate)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
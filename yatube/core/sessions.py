@@ -0,0 +1,44 @@
+from copy import deepcopy
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore)
+
+from .localcache import LocalCache
+
+
+class SessionStore(CachedDBStore):
+    """Сессии cached_db с дополнительным кэшем в памяти процесса.
+
+    Чтение: память процесса -> общий кэш -> БД; запись и удаление идут в
+    БД и общий кэш, а запись в памяти процесса сбрасывается. Другие
+    процессы могут видеть прежние данные сессии (в том числе после выхода
+    пользователя) не дольше SESSION_LOCAL_CACHE_TIMEOUT секунд. Сессия,
+    как и в стандартных бэкендах, загружается только при обращении к ней.
+    """
+
+    local = LocalCache(
+        settings.SESSION_LOCAL_CACHE_SIZE,
+        settings.SESSION_LOCAL_CACHE_TIMEOUT,
+    )
+
+    def load(self):
+        if self.session_key is not None:
+            data = self.local.get(self.session_key)
+            if data is not None:
+                # Копия: словарь сессии меняется на месте
+                return deepcopy(data)
+        data = super().load()
+        if data and self.session_key is not None:
+            self.local.set(self.session_key, deepcopy(data))
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        self.local.delete(self.session_key)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key is not None:
+            self.local.delete(key)
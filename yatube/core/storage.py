@@ -0,0 +1,65 @@
+import gzip
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import brotli, brotli_compress
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map', '.ico',
+)
+MIN_SIZE = 200
+
+
+def gzip_compress(data):
+    # mtime=0: одинаковое содержимое - одинаковый .gz при каждой сборке
+    buffer = BytesIO()
+    with gzip.GzipFile(
+            mode='wb', compresslevel=9, fileobj=buffer, mtime=0) as output:
+        output.write(data)
+    return buffer.getvalue()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и сжатыми копиями рядом.
+
+    После обычной обработки collectstatic для текстовых файлов пишутся
+    варианты .gz и (если установлен brotli) .br, которые веб-сервер
+    отдаёт без сжатия на лету (nginx gzip_static / brotli_static).
+    Имена с хэшем позволяют кэшировать файлы без срока давности.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Файлы со ссылками (css) обрабатываются в несколько проходов;
+        # сжимается итоговое имя каждого файла
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in hashed_names.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for compressed_name in self.write_compressed(name):
+                    yield name, compressed_name, True
+
+    def write_compressed(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_SIZE:
+            return
+        variants = [('.gz', gzip_compress)]
+        if brotli is not None:
+            variants.append(('.br', brotli_compress))
+        for suffix, compress in variants:
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
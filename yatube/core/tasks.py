@@ -0,0 +1,17 @@
+from django.conf import settings
+
+from jobs.queue import task
+
+from .maintenance import cleanup_ratelimits, cleanup_sessions
+
+
+@task(name='core.cleanup_sessions', max_attempts=1)
+def cleanup_expired_sessions():
+    """Периодическая очистка истёкших сессий (JOBS_PERIODIC)."""
+    cleanup_sessions(settings.SESSION_CLEANUP_CHUNK_SIZE)
+
+
+@task(name='core.cleanup_ratelimits', max_attempts=1)
+def cleanup_expired_ratelimits():
+    """Периодическая очистка истёкших счётчиков частоты (JOBS_PERIODIC)."""
+    cleanup_ratelimits(settings.RATELIMIT_CLEANUP_CHUNK_SIZE)
@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def project_template_dirs(include_all=False):
+    """Каталоги шаблонов: DIRS из настроек и templates/ приложений.
+
+    По умолчанию берутся только приложения проекта - шаблоны админки и
+    сторонних пакетов прогревать при каждом старте незачем.
+    """
+    dirs = []
+    for engine in engines.all():
+        dirs.extend(engine.dirs)
+    for app_dir in get_app_template_dirs('templates'):
+        if include_all or app_dir.startswith(settings.BASE_DIR):
+            dirs.append(app_dir)
+    return dirs
+
+
+def iter_template_names(include_all=False):
+    seen = set()
+    for template_dir in project_template_dirs(include_all):
+        for root, _, files in os.walk(template_dir):
+            for filename in sorted(files):
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, template_dir).replace(
+                    os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates(include_all=False):
+    """Разбирает все шаблоны заранее.
+
+    С cached.Loader результат остаётся в памяти процесса, поэтому первый
+    запрос не тратит время на поиск и разбор base.html и его include-ов.
+    Возвращает количество загруженных шаблонов и список ошибок
+    [(имя шаблона, исключение)].
+    """
+    loaded, errors = 0, []
+    for name in iter_template_names(include_all):
+        for engine in engines.all():
+            try:
+                engine.get_template(name)
+                loaded += 1
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+    return loaded, errors
@@ -1,4 +1,37 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.db import connection
+from django.test import (RequestFactory, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from django.utils import timezone
+
+from core.compression import CompressionMiddleware, no_compression
+from core.context_processors.year import year
+from core.maintenance import cleanup_ratelimits, cleanup_sessions
+from core.models import RateLimitCounter
+from core.pagecache import get_generation, invalidate_pages
+from core.pagination import WindowedPaginator
+from core.profiling import RenderProfile
+from core.ratelimit import hit
+from core.sessions import SessionStore
+from core.templating import iter_template_names
+from posts.models import Group, Post
 
 
 class ViewTestClass(TestCase):
@@ -6,3 +39,341 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, 404)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class TemplateWarmupTests(TestCase):
+    def test_project_templates_are_found(self):
+        """.Проверяем, что прогрев находит шаблоны проекта, но не админки."""
+        names = set(iter_template_names())
+        self.assertIn('base.html', names)
+        self.assertIn('posts/includes/paginator.html', names)
+        self.assertNotIn('admin/base.html', names)
+
+    def test_warm_templates_command(self):
+        """.Проверяем, что все шаблоны проекта разбираются без ошибок."""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('без ошибок', out.getvalue())
+
+    def test_cached_loader_passes_template_checks(self):
+        """.Проверяем, что настройки шаблонов не дают предупреждений."""
+        from django.core.checks import run_checks
+
+        self.assertEqual(
+            [message.id for message in run_checks()
+             if message.id == 'debug_toolbar.W006'],
+            [],
+        )
+
+
+class ProductionSettingsTests(TestCase):
+    def test_production_profile_drops_debug_apps(self):
+        """.Проверяем, что production-профиль не грузит отладочные модули."""
+        from yatube import settings_production
+
+        self.assertNotIn('debug_toolbar', settings_production.INSTALLED_APPS)
+        self.assertFalse(any(
+            'debug_toolbar' in item for item in settings_production.MIDDLEWARE
+        ))
+        self.assertIn(
+            'posts.apps.PostsConfig', settings_production.INSTALLED_APPS)
+        self.assertFalse(settings_production.DEBUG)
+
+
+class RenderProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_year_is_lazy(self):
+        """.Проверяем, что год вычисляется только при использовании."""
+        context = year(None)
+        self.assertEqual(str(context['year']), str(date.today().year))
+
+    def test_footer_does_not_force_year(self):
+        """.Проверяем, что подвал не вычисляет год из контекста."""
+        with mock.patch(
+                'core.context_processors.year.current_year') as current_year:
+            response = self.client.get(reverse('about:author'))
+        current_year.assert_not_called()
+        self.assertContains(response, f'© {date.today().year} Copyright')
+
+    def test_profile_attributes_time_to_includes_and_processors(self):
+        """.Проверяем, что профиль видит include-ы и контекст-процессоры."""
+        profile = RenderProfile()
+        with profile.active():
+            self.client.get(reverse('about:author'))
+        names = {row[0] for row in profile.rows()}
+        self.assertIn('about/author.html', names)
+        self.assertIn('includes/header.html', names)
+        self.assertIn(
+            '[context processor] core.context_processors.year.year', names)
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sliding_window(self):
+        """.Проверяем лимит в окне и учёт запросов прошлого окна."""
+        start = 600.0
+        for _ in range(3):
+            self.assertEqual(hit('test', 'ip:1', '3/m', now=start), 0)
+        self.assertEqual(hit('test', 'ip:1', '3/m', now=start + 30), 31)
+        self.assertEqual(hit('test', 'ip:2', '3/m', now=start + 30), 0)
+        # В середине следующего окна прошлое учитывается наполовину
+        self.assertEqual(hit('test', 'ip:1', '3/m', now=start + 90), 0)
+        self.assertEqual(hit('test', 'ip:1', '3/m', now=start + 90), 31)
+
+    @override_settings(RATELIMITS={'comment': '2/m'})
+    def test_view_returns_429(self):
+        """.Проверяем ответ 429 при частых комментариях."""
+        user = get_user_model().objects.create_user(username='bot')
+        self.client.force_login(user)
+        url = reverse('posts:add_comment', args=(1,))
+        for _ in range(2):
+            self.assertNotEqual(self.client.post(url).status_code, 429)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTemplateUsed(response, 'core/429.html')
+        self.assertIn('Retry-After', response)
+
+
+def big_page(request):
+    return HttpResponse('<p>Пост</p>' * 100)
+
+
+def big_image(request):
+    return HttpResponse(b'\x00' * 2000, content_type='image/png')
+
+
+class RateLimitConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    HITS = 5
+
+    def setUp(self):
+        cache.clear()
+
+    def hammer(self, rate):
+        """Запросы из нескольких потоков одновременно; число пропущенных."""
+        barrier = threading.Barrier(self.THREADS)
+        allowed = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.HITS):
+                    if not hit('race', 'ip:1', rate, now=600.0):
+                        allowed.append(1)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(allowed)
+
+    def test_db_counter_holds_limit(self):
+        """.Проверяем лимит при параллельных запросах со счётчиком в БД."""
+        self.assertLessEqual(self.hammer('7/m'), 7)
+        self.assertEqual(
+            RateLimitCounter.objects.get().count, self.THREADS * self.HITS)
+        self.assertEqual(cleanup_ratelimits(chunk_size=10), 1)
+
+    @override_settings(RATELIMIT_STORAGE='cache')
+    def test_cache_counter_holds_limit(self):
+        """.Проверяем лимит при параллельных запросах со счётчиком в кэше."""
+        self.assertEqual(self.hammer('7/m'), 7)
+
+
+class CompressionTests(TestCase):
+    def get(self, view):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        return CompressionMiddleware(view)(request)
+
+    def test_html_is_compressed(self):
+        """.Проверяем сжатие HTML-страниц."""
+        response = self.get(big_page)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), '<p>Пост</p>' * 100)
+
+    def test_opt_out_and_compressed_types_are_skipped(self):
+        """.Проверяем отключение сжатия для view и для картинок."""
+        for view in (no_compression(big_page), big_image):
+            with self.subTest(view=view):
+                self.assertFalse(
+                    self.get(view).has_header('Content-Encoding'))
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """.Проверяем имена с хэшем и копии .gz после collectstatic."""
+        source, target = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, target)
+        css = 'body { color: black; }\n' * 50
+        with open(os.path.join(source, 'site.css'), 'w') as css_file:
+            css_file.write(css)
+        with override_settings(
+                STATICFILES_DIRS=[source], STATIC_ROOT=target,
+                STATICFILES_STORAGE=(
+                    'core.storage.CompressedManifestStaticFilesStorage')):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        names = os.listdir(target)
+        hashed = [
+            name for name in names
+            if name.startswith('site.') and name.endswith('.css')
+            and name != 'site.css'
+        ]
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(hashed[0] + '.gz', names)
+        with gzip.open(os.path.join(target, hashed[0] + '.gz'), 'rt') as gz:
+            self.assertEqual(gz.read(), css)
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Исходный текст')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:group_list', args=('test-slug',))
+
+    def change_text_silently(self, text):
+        # update() не шлёт сигналов - кэш страниц не сбрасывается
+        Post.objects.filter(pk=self.post.pk).update(text=text)
+
+    def test_anonymous_pages_are_cached_and_invalidated(self):
+        """.Проверяем кэш страниц анонимов и сброс по сигналу записи."""
+        self.assertContains(self.client.get(self.url), 'Исходный текст')
+        self.change_text_silently('Новый текст')
+        self.assertContains(self.client.get(self.url), 'Исходный текст')
+        self.assertContains(
+            self.client.get(self.url, {'page': 1}), 'Новый текст')
+        self.assertContains(
+            self.client.get(self.url, {'utm': 'x'}), 'Новый текст')
+        Group.objects.get(pk=self.group.pk).save()
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_generation_keys_are_memcached_safe(self):
+        """.Проверяем ключи поколений для slug и имён не в ASCII."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            invalidate_pages(['group:Тестовый слаг'])
+            get_generation('author:имя с пробелом')
+
+    def test_logged_in_users_bypass_cache(self):
+        """.Проверяем, что с сессией страницы не берутся из кэша."""
+        self.client.get(self.url)
+        self.change_text_silently('Новый текст')
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_csrf_cookie_bypasses_cache(self):
+        """.Проверяем, что с CSRF-cookie страницы не берутся из кэша."""
+        self.client.get(self.url)
+        self.change_text_silently('Новый текст')
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'token'
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_compressed_body_is_served_as_is(self):
+        """.Проверяем, что сжатое тело отдаётся клиенту без пересжатия."""
+        self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(
+            'Исходный текст', gzip.decompress(response.content).decode())
+        invalidate_pages(['group:test-slug'])
+        self.change_text_silently('Новый текст')
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+
+class SessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SessionStore.local.clear()
+
+    def test_session_is_read_from_process_cache(self):
+        """.Проверяем чтение сессии из памяти процесса и её сброс."""
+        store = SessionStore()
+        store['answer'] = 42
+        store.save()
+        key = store.session_key
+        self.assertEqual(SessionStore(key)['answer'], 42)
+        Session.objects.all().delete()
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(key)['answer'], 42)
+        SessionStore(key).delete()
+        self.assertNotIn('answer', SessionStore(key))
+
+    def test_views_without_session_access_do_not_load_it(self):
+        """.Проверяем, что view без обращения к сессии её не загружает."""
+        user = get_user_model().objects.create_user(username='auth')
+        self.client.force_login(user)
+        SessionStore.local.clear()
+        cache.clear()
+        self.client.get(reverse('posts:feed'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:feed'))
+
+    def test_cleanup_in_chunks(self):
+        """.Проверяем удаление только истёкших сессий пачками."""
+        now = timezone.now()
+        for number in range(5):
+            Session.objects.create(
+                session_key=f'expired{number}', session_data='',
+                expire_date=now - timedelta(days=1))
+        Session.objects.create(
+            session_key='alive', session_data='',
+            expire_date=now + timedelta(days=1))
+        self.assertEqual(cleanup_sessions(chunk_size=2), 5)
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive'],
+        )
+
+
+class WindowedPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_page_window(self):
+        """.Проверяем номера страниц вокруг текущей с пропусками."""
+        paginator = WindowedPaginator(range(1000), 10, window=2)
+        self.assertEqual(
+            paginator.get_page(50).page_window,
+            [1, None, 48, 49, 50, 51, 52, None, 100])
+        self.assertEqual(
+            paginator.get_page(2).page_window, [1, 2, 3, 4, None, 100])
+        self.assertEqual(
+            paginator.get_page(99).page_window, [1, None, 97, 98, 99, 100])
+
+    def test_depth_is_capped(self):
+        """.Проверяем, что дальние страницы недоступны."""
+        paginator = WindowedPaginator(range(1000), 10, max_pages=20)
+        self.assertEqual(paginator.num_pages, 20)
+        page = paginator.get_page(99)
+        self.assertEqual(page.number, 20)
+        self.assertFalse(page.has_next())
+
+    def test_count_is_read_from_cache(self):
+        """.Проверяем, что число записей считается только при промахе."""
+        author = get_user_model().objects.create_user(username='author')
+        Post.objects.bulk_create(
+            [Post(author=author, text='Пост') for _ in range(15)])
+        with self.assertNumQueries(1):
+            count = WindowedPaginator(
+                Post.objects.all(), 10, count_key='test-count').count
+        self.assertEqual(count, 15)
+        cache.set('test-count', 25)
+        with self.assertNumQueries(0):
+            paginator = WindowedPaginator(
+                Post.objects.all(), 10, count_key='test-count')
+            self.assertEqual(paginator.num_pages, 3)
@@ -20,3 +20,11 @@ def permission_denied(request, exception):
 def csrf_failure(request, reason=''):
     template = 'core/403csrf.html'
     return render(request, template)
+
+
+def too_many_requests(request, retry_after):
+    template = 'core/429.html'
+    context = {'retry_after': retry_after}
+    response = render(request, template, context, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
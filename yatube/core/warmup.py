@@ -0,0 +1,26 @@
+import gc
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+
+from .templating import warm_templates
+
+
+def warm_up():
+    """Загружает всё, что иначе загрузилось бы на первом запросе.
+
+    Вызывается из wsgi.py. При запуске gunicorn с preload_app это
+    происходит в мастер-процессе до fork-а, и воркеры получают уже
+    импортированные view, разобранный URLconf и шаблоны через
+    copy-on-write, не тратя на это время после автомасштабирования.
+    """
+    # URLconf импортирует все view и их зависимости
+    get_resolver().url_patterns
+    if settings.TEMPLATE_WARMUP:
+        warm_templates()
+    # Соединения с БД нельзя разделять между процессами после fork-а
+    connections.close_all()
+    if settings.GC_FREEZE and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
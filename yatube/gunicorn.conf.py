@@ -0,0 +1,14 @@
+"""Настройки gunicorn: gunicorn -c gunicorn.conf.py yatube.wsgi."""
+import multiprocessing
+import os
+
+raw_env = [
+    'DJANGO_SETTINGS_MODULE='
+    + os.getenv('DJANGO_SETTINGS_MODULE', 'yatube.settings_production'),
+]
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(
+    os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Приложение загружается и прогревается (core.warmup) в мастер-процессе
+# один раз, воркеры получают его через fork
+preload_app = True
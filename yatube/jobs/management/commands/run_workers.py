@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import (claim, purge_done, release_stale, run,
+                        schedule_periodic)
+
+MAINTENANCE_INTERVAL = 60
+
+
+def work(worker, stop, poll_interval, once):
+    """Цикл воркера: забрать задачу, выполнить, при пустой очереди ждать."""
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim(worker)
+            if job is not None:
+                run(job)
+                continue
+            if once:
+                break
+            stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул воркеров очереди задач (jobs.Job).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.JOBS_WORKERS,
+            help='Количество воркеров в пуле.'
+        )
+        parser.add_argument(
+            '--mode', choices=('thread', 'process'), default='thread',
+            help='Воркеры-потоки (по умолчанию) или отдельные процессы.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза (сек) при пустой очереди.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить все готовые задачи и завершиться.'
+        )
+
+    def maintenance(self):
+        release_stale(settings.JOBS_LOCK_TIMEOUT)
+        purge_done(settings.JOBS_KEEP_DONE)
+        schedule_periodic()
+        # Соединение родителя не должно достаться дочерним процессам
+        connections.close_all()
+
+    def handle(self, *args, **options):
+        self.maintenance()
+        if options['mode'] == 'process':
+            stop = multiprocessing.Event()
+            factory = multiprocessing.Process
+        else:
+            stop = threading.Event()
+            factory = threading.Thread
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        pool = [
+            factory(
+                target=work,
+                args=(f'{prefix}:{number}', stop,
+                      options['poll_interval'], options['once']),
+                daemon=True,
+            )
+            for number in range(options['workers'])
+        ]
+        for worker in pool:
+            worker.start()
+        self.stdout.write(
+            f'Запущено воркеров: {len(pool)} ({options["mode"]})')
+        last_maintenance = time.monotonic()
+        while any(worker.is_alive() for worker in pool):
+            for worker in pool:
+                worker.join(timeout=0.5)
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                self.maintenance()
+                last_maintenance = time.monotonic()
@@ -0,0 +1,164 @@
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+BACKOFF_BASE = 5
+BACKOFF_MAX = 60 * 60
+CLAIM_BATCH = 10
+
+
+class Task:
+    """Зарегистрированная задача: обычная функция с именем в реестре."""
+
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, key=None, countdown=0, **kwargs):
+        return enqueue(self.name, key=key, countdown=countdown, **kwargs)
+
+
+def task(name=None, max_attempts=5):
+    """Регистрирует функцию как задачу очереди.
+
+    Аргументы задачи передаются только именованными и должны
+    сериализоваться в JSON (id объектов, а не сами объекты).
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registered = Task(func, task_name, max_attempts)
+        REGISTRY[task_name] = registered
+        return registered
+    return decorator
+
+
+def enqueue(name, key=None, countdown=0, **kwargs):
+    """Ставит задачу в очередь; с JOBS_EAGER выполняет её сразу.
+
+    Если передан ключ идемпотентности и задача с таким ключом уже есть,
+    новая не создаётся и возвращается существующая.
+    """
+    registered = REGISTRY[name]
+    if settings.JOBS_EAGER:
+        registered(**kwargs)
+        return None
+    job = Job(
+        name=name,
+        payload=json.dumps(kwargs),
+        key=key,
+        max_attempts=registered.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+    if key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.get(key=key)
+    return job
+
+
+def schedule_periodic(now=None):
+    """Ставит периодические задачи из settings.JOBS_PERIODIC.
+
+    Ключ идемпотентности - имя задачи и номер интервала, поэтому при
+    нескольких запущенных run_workers задача ставится один раз за
+    интервал.
+    """
+    timestamp = (now or timezone.now()).timestamp()
+    for name, interval in settings.JOBS_PERIODIC.items():
+        enqueue(name, key=f'periodic:{name}:{int(timestamp // interval)}')
+
+
+def backoff(attempts):
+    """Задержка перед повтором: экспонента со случайным разбросом."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 4)
+
+
+def release_stale(lock_timeout):
+    """Возвращает в очередь задачи зависших или упавших воркеров."""
+    deadline = timezone.now() - timedelta(seconds=lock_timeout)
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=deadline
+    ).update(status=Job.PENDING, locked_by='')
+
+
+def claim(worker):
+    """Атомарно забирает одну готовую задачу.
+
+    Условный UPDATE ... WHERE status='pending' срабатывает только у одного
+    из конкурирующих воркеров, поэтому блокировки строк (которых нет в
+    SQLite) не нужны.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=now
+    ).values_list('id', flat=True)[:CLAIM_BATCH]
+    for job_id in list(candidates):
+        claimed = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def run(job):
+    """Выполняет задачу и записывает результат или планирует повтор."""
+    registered = REGISTRY.get(job.name)
+    try:
+        if registered is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована')
+        registered(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Ошибка в задаче %s', job)
+        if job.attempts >= job.max_attempts or registered is None:
+            update = {'status': Job.FAILED, 'finished': timezone.now()}
+        else:
+            update = {
+                'status': Job.PENDING,
+                'run_at': timezone.now() + timedelta(
+                    seconds=backoff(job.attempts)),
+            }
+        Job.objects.filter(id=job.id).update(
+            last_error=error, locked_by='', **update)
+        return False
+    Job.objects.filter(id=job.id).update(
+        status=Job.DONE, finished=timezone.now(), locked_by='')
+    return True
+
+
+def purge_done(older_than):
+    """Удаляет выполненные задачи старше `older_than` секунд.
+
+    Пока запись жива, она же защищает от повторной постановки задачи с
+    тем же ключом идемпотентности.
+    """
+    deadline = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished__lt=deadline).delete()
+    return deleted
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim, enqueue, run, schedule_periodic, task
+
+CALLS = []
+
+
+@task(name='tests.record', max_attempts=2)
+def record(value):
+    CALLS.append(value)
+
+
+@task(name='tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('Ошибка для теста')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        """.Проверяем постановку задачи и её выполнение воркером."""
+        job = record.delay(value=42)
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(CALLS, [])
+        claimed = claim('test-worker')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertTrue(run(claimed))
+        self.assertEqual(CALLS, [42])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.DONE)
+        self.assertIsNone(claim('test-worker'))
+
+    def test_idempotency_key(self):
+        """.Проверяем, что задача с тем же ключом не ставится повторно."""
+        first = enqueue('tests.record', key='same', value=1)
+        second = enqueue('tests.record', key='same', value=2)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_retry_with_backoff_then_fail(self):
+        """.Проверяем повтор с задержкой и отметку об ошибке."""
+        job = fail.delay()
+        self.assertFalse(run(claim('test-worker')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertFalse(run(claim('test-worker')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        """.Проверяем выполнение задач сразу в режиме JOBS_EAGER."""
+        record.delay(value='inline')
+        self.assertEqual(CALLS, ['inline'])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_PERIODIC={'tests.record': 300})
+    def test_periodic_task_is_enqueued_once_per_interval(self):
+        """.Проверяем постановку периодической задачи раз в интервал."""
+        now = timezone.now()
+        schedule_periodic(now)
+        schedule_periodic(now)
+        self.assertEqual(Job.objects.count(), 1)
+        schedule_periodic(now + timedelta(seconds=300))
+        self.assertEqual(Job.objects.count(), 2)
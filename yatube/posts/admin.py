@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Comment, Follow, Group, Post
+from .models import (Comment, Follow, Group, Notification, Post,
+                     PostRevision)
+from .purge import soft_delete_comments, soft_delete_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,6 +11,13 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    # Удаление - пометка; физически посты удаляет очередь (posts.purge)
+    def delete_model(self, request, obj):
+        soft_delete_posts(Post.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        soft_delete_posts(queryset)
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'description')
@@ -20,8 +29,16 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'text', 'post', 'created')
     search_fields = ('text',)
 
+    def delete_model(self, request, obj):
+        soft_delete_comments(Comment.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        soft_delete_comments(queryset)
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow)
+admin.site.register(Notification)
+admin.site.register(PostRevision)
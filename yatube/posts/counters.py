@@ -0,0 +1,52 @@
+from hashlib import md5
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Post
+
+COUNT_KEY = 'post_count:{scope}'
+# Изменения за это время пересчитываются одной задачей
+COUNT_REFRESH_DELAY = 10
+
+
+def count_key(scope):
+    """Ключ числа постов списка: scope - index, author:<username> или
+    group:<slug>, как у лент и кэша страниц."""
+    # slug и username могут содержать символы, недопустимые в ключах
+    return COUNT_KEY.format(scope=md5(scope.encode()).hexdigest())
+
+
+def scope_posts(scope):
+    kind, _, value = scope.partition(':')
+    if kind == 'author':
+        return Post.objects.filter(author__username=value)
+    if kind == 'group':
+        return Post.objects.filter(group__slug=value)
+    return Post.objects.all()
+
+
+def refresh_post_counts(scopes):
+    cache.set_many(
+        {count_key(scope): scope_posts(scope).count() for scope in scopes},
+        settings.PAGINATOR_COUNT_TIMEOUT,
+    )
+
+
+def post_counts_changed(scopes):
+    """Ставит пересчёт чисел постов списков в очередь.
+
+    До выполнения задачи страницы показывают прежнее число страниц;
+    задачи одного списка за COUNT_REFRESH_DELAY секунд склеиваются
+    ключом идемпотентности.
+    """
+    from .tasks import refresh_counts
+
+    window = int(time() // COUNT_REFRESH_DELAY)
+    for scope in scopes:
+        refresh_counts.delay(
+            key=f'post_count:{scope}:{window}',
+            countdown=COUNT_REFRESH_DELAY,
+            scopes=[scope],
+        )
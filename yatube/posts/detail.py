@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Post
+
+DETAIL_KEY = 'post_detail:{post_id}'
+AUTHOR_POSTS_KEY = 'post_detail:author_posts:{author_id}'
+DETAIL_TIMEOUT = 60 * 10
+
+
+def detail_key(post_id):
+    return DETAIL_KEY.format(post_id=post_id)
+
+
+def author_posts_key(author_id):
+    return AUTHOR_POSTS_KEY.format(author_id=author_id)
+
+
+def load_post_detail(post_id):
+    """Пост с автором, группой и числом постов автора - один запрос,
+    комментарии с авторами - второй."""
+    try:
+        post = Post.objects.for_detail().get(pk=post_id)
+    except Post.DoesNotExist:
+        raise Http404('Пост не найден')
+    comments = list(post.comments.select_related('author'))
+    return post, comments
+
+
+def get_post_detail(post_id):
+    """Данные страницы поста: (post, comments, число постов автора).
+
+    Пост и комментарии хранятся в кэше одной записью и удаляются при
+    правке поста и изменении комментариев; число постов автора хранится
+    отдельно и сбрасывается при создании и удалении его постов.
+    Переименование группы или автора видно на странице не позже чем
+    через DETAIL_TIMEOUT секунд.
+    """
+    key = detail_key(post_id)
+    entry = cache.get(key)
+    if entry is None:
+        post, comments = load_post_detail(post_id)
+        cache.set_many({
+            key: (post, comments),
+            author_posts_key(post.author_id): post.author_posts_count,
+        }, DETAIL_TIMEOUT)
+        return post, comments, post.author_posts_count
+    post, comments = entry
+    count_key = author_posts_key(post.author_id)
+    count = cache.get(count_key)
+    if count is None:
+        count = Post.objects.filter(author_id=post.author_id).count()
+        cache.set(count_key, count, DETAIL_TIMEOUT)
+    return post, comments, count
+
+
+def forget_post_detail(post_id):
+    cache.delete(detail_key(post_id))
+
+
+def forget_author_posts_count(author_id):
+    cache.delete(author_posts_key(author_id))
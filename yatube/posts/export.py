@@ -0,0 +1,88 @@
+import json
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Follow, Post
+
+EXPORT_CHUNK_SIZE = 2000
+FILE_CHUNK_SIZE = 64 * 1024
+DATA_NAME = 'data.ndjson'
+IMAGES_DIR = 'images/'
+
+
+def export_rows(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Посты, комментарии и подписки пользователя словарями.
+
+    Строки читаются через iterator(): без кэша QuerySet и без создания
+    моделей, поэтому память не растёт с числом постов автора.
+    """
+    querysets = (
+        ('post', Post.objects.filter(author=user).order_by('pk').values(
+            'id', 'text', 'pub_date', 'group__slug', 'image')),
+        ('comment', Comment.objects.filter(author=user).order_by(
+            'pk').values('id', 'post_id', 'text', 'created')),
+        ('following', Follow.objects.filter(user=user).order_by(
+            'pk').values('id', 'author__username')),
+        ('follower', Follow.objects.filter(author=user).order_by(
+            'pk').values('id', 'user__username')),
+    )
+    for kind, queryset in querysets:
+        for row in queryset.iterator(chunk_size=chunk_size):
+            row['type'] = kind
+            yield row
+
+
+def ndjson_lines(user, chunk_size=EXPORT_CHUNK_SIZE):
+    for row in export_rows(user, chunk_size):
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n'
+
+
+def image_names(user, chunk_size=EXPORT_CHUNK_SIZE):
+    return (
+        Post.objects.filter(author=user).exclude(image='').order_by('pk')
+        .values_list('image', flat=True).iterator(chunk_size=chunk_size)
+    )
+
+
+class StreamBuffer:
+    """Файлоподобный буфер без seek/tell: zipfile пишет в него архив
+    потоково (с data descriptor), а генератор забирает готовые байты."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def zip_chunks(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """ZIP-архив с data.ndjson и картинками постов, отдаваемый кусками."""
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(DATA_NAME, 'w', force_zip64=True) as data:
+            for line in ndjson_lines(user, chunk_size):
+                data.write(line)
+                if buffer.chunks:
+                    yield buffer.pop()
+        for name in image_names(user, chunk_size):
+            if not default_storage.exists(name):
+                continue
+            with default_storage.open(name) as source, archive.open(
+                    IMAGES_DIR + name, 'w', force_zip64=True) as target:
+                for chunk in source.chunks(FILE_CHUNK_SIZE):
+                    target.write(chunk)
+                    if buffer.chunks:
+                        yield buffer.pop()
+    yield buffer.pop()
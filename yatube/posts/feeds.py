@@ -0,0 +1,161 @@
+from hashlib import md5
+from time import time
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from users.cache import get_user_or_404
+
+from .models import Group, Post
+
+FEED_LIMIT = 20
+FEED_TIMEOUT = 60 * 60 * 24
+FEED_KEY = 'feed:{scope}:{kind}'
+FEED_KINDS = ('rss', 'atom')
+
+
+class PostsFeed(Feed):
+    """Последние посты сайта."""
+
+    title = 'Yatube: последние обновления'
+    description = 'Новые посты всех авторов Yatube'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def items(self):
+        return Post.objects.for_list()[:FEED_LIMIT]
+
+    def item_title(self, item):
+        return truncatechars(item.text, 60)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(PostsFeed):
+    """Последние посты сообщества."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def items(self, group):
+        return group.posts.for_list()[:FEED_LIMIT]
+
+
+class AuthorPostsFeed(PostsFeed):
+    """Последние посты автора."""
+
+    def get_object(self, request, username):
+        return get_user_or_404(username)
+
+    def title(self, author):
+        return f'Yatube: посты {author.username}'
+
+    def description(self, author):
+        return f'Новые посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+    def items(self, author):
+        return author.posts.for_list()[:FEED_LIMIT]
+
+
+class AtomPostsFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class AtomGroupPostsFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return group.description
+
+
+class AtomAuthorPostsFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return f'Новые посты пользователя {author.username}'
+
+
+def feed_key(scope, kind):
+    # slug и username могут содержать символы, недопустимые в ключах
+    scope_hash = md5(scope.encode()).hexdigest()
+    return FEED_KEY.format(scope=scope_hash, kind=kind)
+
+
+def invalidate_feeds(scopes):
+    cache.delete_many(
+        [feed_key(scope, kind) for scope in scopes for kind in FEED_KINDS])
+
+
+def cached_feed(feed, kind, scope):
+    """View ленты, отдающая готовое тело из кэша.
+
+    Тело, ETag и время генерации хранятся одной записью, поэтому на
+    запрос приходится ровно одно обращение к кэшу; If-None-Match и
+    If-Modified-Since обрабатываются без генерации ленты. Запись
+    удаляется при создании и изменении поста (posts.signals).
+    """
+    def view(request, **kwargs):
+        key = feed_key(scope(**kwargs), kind)
+        entry = cache.get(key)
+        if entry is None:
+            response = feed(request, **kwargs)
+            body = response.content
+            entry = {
+                'body': body,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(md5(body).hexdigest()),
+                'last_modified': int(time()),
+            }
+            cache.set(key, entry, FEED_TIMEOUT)
+        response = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'])
+        if response is None:
+            response = HttpResponse(
+                entry['body'], content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return response
+    return view
+
+
+index_rss = cached_feed(PostsFeed(), 'rss', lambda: 'index')
+index_atom = cached_feed(AtomPostsFeed(), 'atom', lambda: 'index')
+group_rss = cached_feed(
+    GroupPostsFeed(), 'rss', lambda slug: f'group:{slug}')
+group_atom = cached_feed(
+    AtomGroupPostsFeed(), 'atom', lambda slug: f'group:{slug}')
+author_rss = cached_feed(
+    AuthorPostsFeed(), 'rss', lambda username: f'author:{username}')
+author_atom = cached_feed(
+    AtomAuthorPostsFeed(), 'atom', lambda username: f'author:{username}')
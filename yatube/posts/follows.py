@@ -0,0 +1,47 @@
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOWING_KEY = 'follows:following:{user_id}'
+FOLLOWING_TIMEOUT = 60 * 60
+
+
+def following_key(user_id):
+    return FOLLOWING_KEY.format(user_id=user_id)
+
+
+def following_ids(user):
+    """Множество id авторов, на которых подписан `user`.
+
+    Хранится в кэше и удаляется при подписке и отписке (posts.signals).
+    """
+    key = following_key(user.pk)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = set(
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True))
+        cache.set(key, author_ids, FOLLOWING_TIMEOUT)
+    return author_ids
+
+
+def forget_following(user_id):
+    cache.delete(following_key(user_id))
+
+
+def followed_author_ids(user, authors):
+    """Множество id авторов из `authors`, на которых подписан `user`.
+
+    Берётся из закэшированного множества подписок: запрос к БД нужен
+    только при промахе кэша; для анонимного пользователя запросов нет.
+    """
+    if not user.is_authenticated:
+        return set()
+    author_ids = {getattr(author, 'pk', author) for author in authors}
+    if not author_ids:
+        return set()
+    return author_ids & following_ids(user)
+
+
+def page_author_ids(page_obj):
+    return {post.author_id for post in page_obj}
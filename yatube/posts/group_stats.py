@@ -0,0 +1,44 @@
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Group, Post
+
+
+def post_added(group_id, pub_date):
+    """+1 пост в группе; одна атомарная UPDATE без чтения строки."""
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_activity=Greatest(F('last_activity'), pub_date),
+    )
+
+
+def post_removed(group_id):
+    Group.objects.filter(pk=group_id, posts_count__gt=0).update(
+        posts_count=F('posts_count') - 1)
+
+
+def rebuild_group_stats(group_ids=None):
+    """Пересчитывает счётчики групп одним агрегирующим запросом.
+
+    Нужен после массовых операций в обход сигналов (bulk_create при
+    импорте) и для сверки счётчиков.
+    """
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    stats = {
+        row['group_id']: row
+        for row in Post.objects.filter(group__in=groups).order_by()
+        .values('group_id').annotate(count=Count('id'), last=Max('pub_date'))
+    }
+    for group_id, last_activity in groups.values_list(
+            'pk', 'last_activity'):
+        row = stats.get(group_id, {'count': 0, 'last': None})
+        Group.objects.filter(pk=group_id).update(
+            posts_count=row['count'],
+            last_activity=max(
+                filter(None, (row['last'], last_activity)),
+                default=timezone.now(),
+            ),
+        )
@@ -0,0 +1,63 @@
+import tempfile
+from io import BytesIO
+from statistics import median
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import User
+
+
+def make_image(size=(1600, 1200)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(120, 180, 240)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку post_create при выполнении побочных эффектов '
+        'в запросе (JOBS_EAGER) и при постановке их в очередь. '
+        'Все изменения в БД откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def measure(self, client, image, repeat):
+        timings = []
+        for number in range(repeat):
+            upload = SimpleUploadedFile(
+                f'bench{number}.jpg', image, content_type='image/jpeg')
+            started = perf_counter()
+            client.post(
+                reverse('posts:post_create'),
+                {'text': 'Пост для замера', 'image': upload},
+            )
+            timings.append(perf_counter() - started)
+        return timings
+
+    def handle(self, *args, **options):
+        image = make_image()
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(
+                    MEDIA_ROOT=media_root, RATELIMIT_ENABLE=False), \
+                transaction.atomic():
+            user = User.objects.create_user(username=f'bench-{uuid4().hex}')
+            client = Client()
+            client.force_login(user)
+            for eager, label in ((True, 'в запросе'), (False, 'в очереди')):
+                with override_settings(JOBS_EAGER=eager):
+                    timings = self.measure(client, image, options['repeat'])
+                self.stdout.write(
+                    f'Побочные эффекты {label}: медиана '
+                    f'{median(timings) * 1000:.1f} мс, максимум '
+                    f'{max(timings) * 1000:.1f} мс'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import SitemapBuilder
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает карту сайта (посты, группы, профили) в SITEMAP_ROOT, '
+        'перезаписывая только изменившиеся файлы (для cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Перезаписать все файлы, а не только изменившиеся.'
+        )
+
+    def handle(self, *args, **options):
+        written = SitemapBuilder().build(full=options['full'])
+        self.stdout.write(f'Перезаписано файлов: {len(written)}')
+        for filename in written:
+            self.stdout.write(f'  {filename}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.suggestions import BATCH_SIZE, build_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «возможно, вы знакомы» (для cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько пользователей обрабатывать за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        processed = build_suggestions(batch_size=options['batch_size'])
+        self.stdout.write(f'Рекомендации пересчитаны для {processed} польз.')
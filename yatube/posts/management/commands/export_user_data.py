@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import ndjson_lines, zip_chunks
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты, комментарии и подписки пользователя '
+        'в NDJSON или ZIP (вместе с картинками).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--zip', action='store_true',
+            help='Выгрузить ZIP-архив с картинками вместо NDJSON.'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки; по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден')
+        chunks = zip_chunks(user) if options['zip'] else ndjson_lines(user)
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from posts.media_gc import GC_BATCH_SIZE, GC_MIN_AGE, collect_orphans
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов (и их превью), на которые не ссылается '
+        'ни один пост. С --dry-run только считает освобождаемое место.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Ничего не удалять, только посчитать.'
+        )
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=GC_BATCH_SIZE)
+        parser.add_argument(
+            '--min-age', type=int, default=GC_MIN_AGE,
+            help='Не трогать файлы моложе стольких секунд.'
+        )
+
+    def handle(self, *args, **options):
+        report = None
+        if options['verbosity'] > 1:
+            def report(name):
+                self.stdout.write(name)
+        stats = collect_orphans(
+            Post._meta.get_field('image').upload_to,
+            dry_run=options['dry_run'],
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            min_age=options['min_age'],
+            report=report,
+        )
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'Проверено файлов: {stats["files"]}\n'
+            f'{action} лишних: {stats["orphans"]}, '
+            f'{stats["bytes"] / 1024 / 1024:.1f} МБ с превью'
+        )
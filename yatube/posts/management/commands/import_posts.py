@@ -0,0 +1,54 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from posts.importer import IMPORT_CHUNK_SIZE, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты и комментарии из NDJSON (формат выгрузки '
+        'export_user_data) пачками через bulk_create, сохраняя даты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл NDJSON; "-" - читать из stdin.')
+        parser.add_argument(
+            '--author',
+            help='Автор для строк без поля "author".'
+        )
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать отсутствующих авторов (без пароля).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+            help='Сколько строк записывать в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(
+            default_author=options['author'],
+            create_authors=options['create_authors'],
+            chunk_size=options['chunk_size'],
+        )
+        started = perf_counter()
+        if options['path'] == '-':
+            stats = importer.run(sys.stdin)
+        else:
+            with open(options['path'], encoding='utf-8') as lines:
+                stats = importer.run(lines)
+        elapsed = perf_counter() - started
+        rows = stats['posts'] + stats['comments']
+        self.stdout.write(
+            f'Постов: {stats["posts"]}, комментариев: {stats["comments"]}, '
+            f'новых авторов: {stats["authors"]}, '
+            f'пропущено строк: {stats["skipped"]}, '
+            f'неизвестных групп: {stats["unknown_groups"]}'
+        )
+        self.stdout.write(
+            f'{rows} строк за {elapsed:.2f} с '
+            f'({rows / elapsed if elapsed else 0:.0f} строк/с)'
+        )
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        'Физически удаляет посты и комментарии, помеченные удалёнными, '
+        'пачками вместе с файлами картинок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.PURGE_CHUNK_SIZE,
+            help='Сколько записей удалять за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза (сек) между пачками.'
+        )
+
+    def handle(self, *args, **options):
+        stats = purge_deleted(options['chunk_size'], options['pause'])
+        self.stdout.write(
+            f'Удалено постов: {stats["posts"]}, '
+            f'комментариев: {stats["comments"]}, '
+            f'картинок: {stats["images"]}'
+        )
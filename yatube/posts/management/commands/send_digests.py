@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import DIGEST_BATCH_SIZE, send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает дайджесты неотправленных уведомлений (для cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DIGEST_BATCH_SIZE,
+            help='Сколько писем отправлять за одну пачку.'
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(batch_size=options['batch_size'])
+        self.stdout.write(f'Отправлено дайджестов: {sent}')
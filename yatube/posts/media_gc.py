@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+from sorl.thumbnail import default
+from sorl.thumbnail import delete as delete_image
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+# Не больше 999 параметров в одном IN для старых версий SQLite
+GC_BATCH_SIZE = 500
+# Файл только что загружен, а пост с ним ещё не сохранён
+GC_MIN_AGE = 60 * 60
+# Удаление пишет в хранилище ключей sorl (в БД): в SQLite один писатель,
+# поэтому потоки параллельно только читают, а удаляют по очереди
+DELETE_LOCK = threading.Lock()
+
+
+def iter_files(root):
+    """Файлы дерева каталогов без построения полного списка (os.scandir)."""
+    directories = [root]
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def iter_batches(directory, batch_size, min_age):
+    """Пачки (имя в хранилище, размер) файлов старше `min_age` секунд."""
+    media_root = settings.MEDIA_ROOT
+    deadline = time.time() - min_age
+    batch = []
+    for entry in iter_files(os.path.join(media_root, directory)):
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > deadline:
+            continue
+        name = os.path.relpath(entry.path, media_root).replace(os.sep, '/')
+        batch.append((name, stat.st_size))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def referenced_names(names):
+    # all_objects: картинки помеченных постов удалит posts.purge
+    return set(
+        Post.all_objects.filter(image__in=names).values_list(
+            'image', flat=True).iterator())
+
+
+def thumbnails_size(name):
+    """Размер превью картинки, известных хранилищу ключей sorl."""
+    image = ImageFile(name)
+    total = 0
+    # У sorl нет публичного чтения списка превью, только их удаление
+    for key in default.kvstore._get(image.key, identity='thumbnails') or []:
+        thumbnail = default.kvstore._get(key)
+        if thumbnail is not None and thumbnail.exists():
+            total += thumbnail.storage.size(thumbnail.name)
+    return total
+
+
+def collect_batch(batch, dry_run, close_connection=False):
+    """Проверяет пачку; возвращает счётчики и имена лишних файлов."""
+    stats = Counter()
+    orphans = []
+    try:
+        referenced = referenced_names([name for name, _ in batch])
+        for name, size in batch:
+            stats['files'] += 1
+            if name in referenced:
+                continue
+            stats['orphans'] += 1
+            stats['bytes'] += size + thumbnails_size(name)
+            orphans.append(name)
+            if not dry_run:
+                with DELETE_LOCK:
+                    delete_image(name)
+    finally:
+        if close_connection:
+            # У каждого потока своё соединение с БД
+            connection.close()
+    return stats, orphans
+
+
+def collect_orphans(directory, dry_run=False, workers=4,
+                    batch_size=GC_BATCH_SIZE, min_age=GC_MIN_AGE,
+                    report=None):
+    """Удаляет (или при dry_run только считает) файлы картинок в
+    `directory` внутри MEDIA_ROOT, на которые не ссылается ни один пост.
+
+    Каталог обходится потоком пачками по `batch_size` файлов, каждая
+    пачка сверяется с БД одним запросом IN, поэтому память не зависит
+    от числа файлов и постов. Пачки сверяются `workers` потоками, в
+    работе одновременно не больше 2 * workers пачек. Вместе с
+    картинкой удаляются её превью и записи sorl о них. `report`
+    вызывается для каждого лишнего файла в вызывающем потоке.
+    """
+    stats = Counter()
+
+    def add(result):
+        batch_stats, orphans = result
+        stats.update(batch_stats)
+        if report is not None:
+            for name in orphans:
+                report(name)
+
+    batches = iter_batches(directory, batch_size, min_age)
+    if workers <= 1:
+        for batch in batches:
+            add(collect_batch(batch, dry_run))
+        return stats
+    with ThreadPoolExecutor(workers) as executor:
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(collect_batch, batch, dry_run, True))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    add(future.result())
+        for future in pending:
+            add(future.result())
+    return stats
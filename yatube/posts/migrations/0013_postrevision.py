@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='edited_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата изменения'),
+        ),
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер версии')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='Полный текст')),
+                ('data', models.TextField(verbose_name='Текст или изменения')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'ordering': ('-number',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postrevision',
+            constraint=models.UniqueConstraint(fields=('post', 'number'), name='unique_post_revision'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_postrevision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('group', 'Группа')], max_length=10, verbose_name='Тип')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Id поста или группы')),
+                ('hour', models.DateTimeField(verbose_name='Час')),
+                ('activity', models.FloatField(default=0, verbose_name='Активность')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='trendingactivity',
+            index=models.Index(fields=['hour'], name='trending_hour_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingactivity',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'hour'), name='unique_trending_bucket'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    stats = (
+        Post.objects.filter(group__isnull=False).order_by()
+        .values('group_id')
+        .annotate(count=models.Count('id'), last=models.Max('pub_date'))
+    )
+    for row in stats:
+        Group.objects.filter(pk=row['group_id']).update(
+            posts_count=row['count'], last_activity=row['last'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_trendingactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Последняя активность'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['-last_activity', '-id'], name='group_activity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['-posts_count', '-id'], name='group_posts_count_idx'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -10,11 +11,80 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Счётчики для каталога групп поддерживаются сигналами (posts.signals)
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
+    last_activity = models.DateTimeField(
+        'Последняя активность',
+        default=timezone.now,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-last_activity', '-id'],
+                name='group_activity_idx'
+            ),
+            models.Index(
+                fields=['-posts_count', '-id'],
+                name='group_posts_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class SoftDeleteManager(models.Manager):
+    """Менеджер по умолчанию: без записей, помеченных удалёнными.
+
+    Помеченные записи физически удаляет задача очереди (posts.purge),
+    до этого они видны только через all_objects.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class PostQuerySet(models.QuerySet):
+    """Общие выборки постов для страниц, лент и API.
+
+    Списки читают только поля карточки поста вместе с автором и группой
+    одним запросом; страница поста - пост целиком со счётчиком постов
+    автора. Новые места, где выводятся посты, должны брать выборку
+    отсюда, а не собирать select_related заново.
+    """
+
+    LIST_FIELDS = (
+        'text', 'pub_date', 'image', 'author_id', 'group_id',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__title', 'group__slug',
+    )
+
+    def for_list(self):
+        return self.select_related('author', 'group').only(*self.LIST_FIELDS)
+
+    def for_detail(self):
+        author_posts = Post.objects.filter(
+            author=models.OuterRef('author')
+        ).order_by().values('author').annotate(
+            count=models.Count('pk')).values('count')
+        return self.select_related('author', 'group').annotate(
+            author_posts_count=models.Subquery(
+                author_posts, output_field=models.IntegerField()))
+
+    def feed_for(self, user):
+        """Посты авторов, на которых подписан `user` (подписки из кэша)."""
+        from .follows import following_ids
+
+        return self.filter(
+            author_id__in=sorted(following_ids(user))).for_list()
+
+
 class Post(models.Model):
     """Посты пользователей, могут быть сгруппированы в сообщества."""
 
@@ -47,13 +117,69 @@ class Post(models.Model):
         blank=True,
         help_text='Загрузите картинку'
     )
+    edited_at = models.DateTimeField(
+        'Дата изменения',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    is_deleted = models.BooleanField(
+        'Удалён',
+        default=False,
+        editable=False
+    )
+
+    objects = SoftDeleteManager.from_queryset(PostQuerySet)()
+    all_objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='post_deleted_idx',
+                condition=models.Q(is_deleted=True)
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Группа на момент загрузки - чтобы при переносе поста в другую
+        # группу сбросить кэш и старой группы (см. posts.signals)
+        instance.loaded_group_id = instance.__dict__.get('group_id')
+        # Текст на момент загрузки - для истории правок (см. posts.revisions)
+        instance.loaded_text = instance.__dict__.get('text')
+        return instance
+
+
+class PostRevision(models.Model):
+    """Версии текста поста: полный снимок или diff к предыдущей версии."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name='Пост'
+    )
+    number = models.PositiveIntegerField('Номер версии')
+    created = models.DateTimeField('Дата', default=timezone.now)
+    is_snapshot = models.BooleanField('Полный текст', default=False)
+    data = models.TextField('Текст или изменения')
+
+    class Meta:
+        ordering = ('-number',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'number'], name='unique_post_revision')
+        ]
+
+    def __str__(self):
+        return f'Пост {self.post_id}, версия {self.number}'
+
 
 class Comment(models.Model):
     """Комментарии пользователей к постам."""
@@ -78,9 +204,24 @@ class Comment(models.Model):
         'Дата публикации комментария',
         auto_now_add=True
     )
+    is_deleted = models.BooleanField(
+        'Удалён',
+        default=False,
+        editable=False
+    )
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='comment_deleted_idx',
+                condition=models.Q(is_deleted=True)
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -110,3 +251,96 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'Author {self.author.id} - User {self.user.id}'
+
+
+class Notification(models.Model):
+    """Уведомления о новых постах отслеживаемых авторов и комментариях."""
+
+    NEW_POST = 'post'
+    NEW_COMMENT = 'comment'
+    KIND_CHOICES = (
+        (NEW_POST, 'Новый пост'),
+        (NEW_COMMENT, 'Новый комментарий'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор события'
+    )
+    kind = models.CharField('Тип', max_length=10, choices=KIND_CHOICES)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name='Комментарий'
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+    is_read = models.BooleanField('Прочитано', default=False)
+    emailed = models.BooleanField('Отправлено в дайджесте', default=False)
+
+    class Meta:
+        ordering = ('-id',)
+        indexes = [
+            models.Index(
+                fields=['recipient', 'is_read'],
+                name='notification_unread_idx'
+            ),
+            models.Index(
+                fields=['emailed', 'recipient'],
+                name='notification_digest_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} для {self.recipient_id}'
+
+
+class TrendingActivity(models.Model):
+    """Взвешенная активность вокруг поста или группы за один час.
+
+    Счётчики увеличиваются по мере появления комментариев и подписок, а
+    рейтинг «Популярное» периодически собирается из последних часов (см.
+    posts.trending), без агрегации таблицы комментариев.
+    """
+
+    POST = 'post'
+    GROUP = 'group'
+    KIND_CHOICES = (
+        (POST, 'Пост'),
+        (GROUP, 'Группа'),
+    )
+
+    kind = models.CharField('Тип', max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField('Id поста или группы')
+    hour = models.DateTimeField('Час')
+    activity = models.FloatField('Активность', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id', 'hour'],
+                name='unique_trending_bucket'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['hour'], name='trending_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}: {self.activity}'
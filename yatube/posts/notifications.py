@@ -0,0 +1,156 @@
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.urls import reverse
+
+from .models import Follow, Notification, Post
+
+UNREAD_KEY = 'notifications:unread:{user_id}'
+UNREAD_TIMEOUT = 60 * 60
+DIGEST_BATCH_SIZE = 100
+
+
+def unread_key(user_id):
+    return UNREAD_KEY.format(user_id=user_id)
+
+
+def unread_count(user):
+    """Число непрочитанных уведомлений; считается в БД только при промахе."""
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, is_read=False, post__is_deleted=False).count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def forget_unread(user_ids):
+    cache.delete_many([unread_key(user_id) for user_id in user_ids])
+
+
+def notify_followers(post):
+    """Уведомляет всех подписчиков автора о новом посте.
+
+    Все уведомления создаются одним bulk_create (многострочный INSERT;
+    SQLite-бэкенд сам делит его на пачки по лимиту параметров).
+    """
+    follower_ids = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id', flat=True)
+    )
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                recipient_id=follower_id,
+                actor_id=post.author_id,
+                kind=Notification.NEW_POST,
+                post_id=post.pk,
+            )
+            for follower_id in follower_ids
+        ],
+        batch_size=settings.NOTIFICATIONS_BATCH_SIZE,
+    )
+    forget_unread(follower_ids)
+    return len(follower_ids)
+
+
+def notify_post_author(comment):
+    """Уведомляет автора поста о новом комментарии (не о своём)."""
+    post_author_id = Post.objects.filter(pk=comment.post_id).values_list(
+        'author_id', flat=True).first()
+    if post_author_id is None or post_author_id == comment.author_id:
+        return 0
+    Notification.objects.create(
+        recipient_id=post_author_id,
+        actor_id=comment.author_id,
+        kind=Notification.NEW_COMMENT,
+        post_id=comment.post_id,
+        comment=comment,
+    )
+    forget_unread([post_author_id])
+    return 1
+
+
+def mark_read(user):
+    updated = Notification.objects.filter(
+        recipient=user, is_read=False).update(is_read=True)
+    forget_unread([user.pk])
+    return updated
+
+
+def digest_message(recipient, notifications, connection=None):
+    lines = []
+    for notification in notifications:
+        url = settings.SITE_URL + reverse(
+            'posts:post_detail', args=(notification.post_id,))
+        lines.append(
+            f'- {notification.get_kind_display()} от '
+            f'{notification.actor.username}: {url}'
+        )
+    body = (
+        f'Здравствуйте, {recipient.username}!\n\n'
+        'Новое на Yatube с прошлого письма:\n' + '\n'.join(lines)
+    )
+    return EmailMessage(
+        subject=f'Yatube: новых событий - {len(notifications)}',
+        body=body,
+        to=[recipient.email],
+        connection=connection,
+    )
+
+
+def pending_digest_batches(batch_size):
+    """Неотправленные уведомления пачками по `batch_size` получателей.
+
+    Получатели перебираются по ключу (recipient_id), без открытого курсора
+    на время отправки, и в памяти держатся события только одной пачки.
+    """
+    pending = Notification.objects.filter(
+        emailed=False, recipient__email__gt='', post__is_deleted=False)
+    last_recipient_id = 0
+    while True:
+        recipient_ids = list(
+            pending.filter(recipient_id__gt=last_recipient_id)
+            .order_by('recipient_id')
+            .values_list('recipient_id', flat=True)
+            .distinct()[:batch_size]
+        )
+        if not recipient_ids:
+            return
+        notifications = list(
+            pending.filter(recipient_id__in=recipient_ids)
+            .select_related('recipient', 'actor')
+            .order_by('recipient_id', 'id')
+        )
+        yield recipient_ids, notifications
+        last_recipient_id = recipient_ids[-1]
+
+
+def send_digests(batch_size=DIGEST_BATCH_SIZE):
+    """Отправляет дайджесты пачками через одно переиспользуемое
+    SMTP-соединение: по письму на получателя со всеми его событиями."""
+    sent = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for recipient_ids, notifications in pending_digest_batches(
+                batch_size):
+            messages = []
+            for _, group in groupby(
+                    notifications, key=attrgetter('recipient_id')):
+                group = list(group)
+                messages.append(
+                    digest_message(group[0].recipient, group, connection))
+            sent += connection.send_messages(messages) or 0
+            # Уведомления, появившиеся во время отправки, уйдут в следующий раз
+            Notification.objects.filter(
+                recipient_id__in=recipient_ids,
+                id__lte=max(notification.pk for notification in notifications),
+            ).update(emailed=True)
+    finally:
+        connection.close()
+    return sent
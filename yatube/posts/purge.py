@@ -0,0 +1,165 @@
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q
+from sorl.thumbnail import delete as delete_image
+
+from core.pagecache import invalidate_pages
+from users.cache import forget_user
+
+from .counters import post_counts_changed
+from .detail import forget_author_posts_count, forget_post_detail
+from .feeds import invalidate_feeds
+from .group_stats import rebuild_group_stats
+from .models import Comment, Follow, Notification, Post, User
+
+# Удаление ставится в очередь с задержкой: задачи, поставленные за это
+# время, склеиваются ключом идемпотентности
+PURGE_DELAY = 60
+
+
+def schedule_purge():
+    from .tasks import purge_deleted_content
+
+    window = int(time.time() // PURGE_DELAY)
+    purge_deleted_content.delay(
+        key=f'purge_deleted:{window}', countdown=PURGE_DELAY)
+
+
+def soft_delete_posts(posts):
+    """Скрывает посты одним UPDATE; физически их удалит purge_deleted.
+
+    Сбрасывает те же кэши, что и сигналы при удалении поста, но один
+    раз на всю выборку.
+    """
+    rows = list(posts.values_list(
+        'pk', 'author_id', 'author__username', 'group_id', 'group__slug'))
+    if not rows:
+        return 0
+    post_ids = [row[0] for row in rows]
+    Post.objects.filter(pk__in=post_ids).update(is_deleted=True)
+    scopes = {'index'}
+    scopes.update(f'author:{username}' for _, _, username, _, _ in rows)
+    scopes.update(f'group:{slug}' for *_, slug in rows if slug)
+    invalidate_feeds(scopes)
+    invalidate_pages(
+        scopes | {'groups', 'trending'}
+        | {f'post:{post_id}' for post_id in post_ids})
+    for post_id in post_ids:
+        forget_post_detail(post_id)
+    for author_id in {row[1] for row in rows}:
+        forget_author_posts_count(author_id)
+    post_counts_changed(scopes)
+    group_ids = {row[3] for row in rows if row[3] is not None}
+    if group_ids:
+        rebuild_group_stats(group_ids)
+    schedule_purge()
+    return len(post_ids)
+
+
+def soft_delete_comments(comments):
+    rows = list(comments.values_list('pk', 'post_id'))
+    if not rows:
+        return 0
+    Comment.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+        is_deleted=True)
+    post_ids = {post_id for _, post_id in rows}
+    invalidate_pages([f'post:{post_id}' for post_id in post_ids])
+    for post_id in post_ids:
+        forget_post_detail(post_id)
+    schedule_purge()
+    return len(rows)
+
+
+def soft_delete_user(user):
+    """Деактивирует пользователя и скрывает его посты и комментарии.
+
+    Сам пользователь, его подписки и уведомления удаляются задачей
+    purge_user после его контента, поэтому каскадное удаление в конце
+    затрагивает только оставшиеся мелкие связи.
+    """
+    from .tasks import purge_deleted_user
+
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    forget_user(user)
+    soft_delete_posts(Post.objects.filter(author=user))
+    soft_delete_comments(Comment.objects.filter(author=user))
+    # Время в ключе: после повторной активации и удаления задача не
+    # склеится с выполненной прошлой (DONE хранятся JOBS_KEEP_DONE)
+    purge_deleted_user.delay(
+        key=f'purge_user:{user.pk}:{int(time.time())}',
+        countdown=PURGE_DELAY, user_id=user.pk)
+
+
+def delete_chunks(queryset, chunk_size, pause=0):
+    """Удаляет записи выборки пачками по pk, каждую в своей транзакции."""
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            queryset.model._base_manager.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        if pause:
+            time.sleep(pause)
+
+
+def delete_image_file(name):
+    """Удаляет картинку и её превью, если на файл не ссылаются другие
+    посты (импорт может переиспользовать имена файлов)."""
+    if Post.all_objects.filter(image=name).exists():
+        return False
+    delete_image(name)
+    return True
+
+
+def purge_deleted(chunk_size, pause=0):
+    """Физически удаляет помеченные посты и комментарии пачками.
+
+    Комментарии поста удаляются до него, так что каскад при удалении
+    пачки постов затрагивает только версии и уведомления. Файлы
+    картинок удаляются после фиксации транзакции пачки.
+    """
+    stats = Counter()
+    stats['comments'] += delete_chunks(
+        Comment.all_objects.filter(is_deleted=True), chunk_size, pause)
+    posts = Post.all_objects.filter(is_deleted=True)
+    while True:
+        rows = list(posts.values_list('pk', 'image')[:chunk_size])
+        if not rows:
+            return stats
+        post_ids = [pk for pk, _ in rows]
+        comments = Comment.all_objects.filter(post_id__in=post_ids)
+        # Пометка отключает сброс кэшей сигналами на каждый комментарий
+        comments.update(is_deleted=True)
+        stats['comments'] += delete_chunks(comments, chunk_size, pause)
+        with transaction.atomic():
+            Post.all_objects.filter(pk__in=post_ids).delete()
+        stats['posts'] += len(post_ids)
+        for name in {image for _, image in rows if image}:
+            stats['images'] += delete_image_file(name)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_user(user_id, chunk_size, pause=0):
+    """Удаляет деактивированного soft_delete_user пользователя целиком."""
+    user = User.objects.filter(pk=user_id, is_active=False).first()
+    if user is None:
+        # Пользователь снова активен или уже удалён
+        return Counter()
+    # Посты и комментарии, появившиеся после пометки
+    Post.all_objects.filter(author=user).update(is_deleted=True)
+    Comment.all_objects.filter(author=user).update(is_deleted=True)
+    stats = purge_deleted(chunk_size, pause)
+    stats['follows'] = delete_chunks(
+        Follow.objects.filter(Q(user=user) | Q(author=user)),
+        chunk_size, pause)
+    stats['notifications'] = delete_chunks(
+        Notification.objects.filter(Q(recipient=user) | Q(actor=user)),
+        chunk_size, pause)
+    user.delete()
+    stats['users'] = 1
+    return stats
@@ -0,0 +1,92 @@
+import json
+import re
+from difflib import SequenceMatcher
+
+from .models import PostRevision
+
+# Каждая SNAPSHOT_EVERY-я версия хранится целиком: восстановление любой
+# версии - это снимок и не больше SNAPSHOT_EVERY - 1 diff-ов
+SNAPSHOT_EVERY = 10
+TOKENS = re.compile(r'\s+|\w+|[^\w\s]')
+
+
+def make_diff(old, new):
+    """Компактный diff по словам в виде JSON-списка операций.
+
+    Число n > 0 - взять n символов старого текста, n < 0 - пропустить -n
+    символов, строка - вставить её. Размер diff-а растёт с объёмом
+    правки, а не с длиной поста.
+    """
+    old_tokens, new_tokens = TOKENS.findall(old), TOKENS.findall(new)
+    matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_length = sum(len(token) for token in old_tokens[i1:i2])
+        if tag == 'equal':
+            ops.append(old_length)
+            continue
+        if old_length:
+            ops.append(-old_length)
+        if j2 > j1:
+            ops.append(''.join(new_tokens[j1:j2]))
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_diff(old, diff):
+    parts, position = [], 0
+    for op in json.loads(diff):
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.append(old[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+
+def is_snapshot(number):
+    return (number - 1) % SNAPSHOT_EVERY == 0
+
+
+def record_revision(post, previous_text):
+    """Сохраняет новую версию поста после правки текста.
+
+    Первая правка сохраняет и исходный текст (версия 1), поэтому у
+    неизменённых постов истории нет вовсе.
+    """
+    last = post.revisions.order_by('-number').values_list(
+        'number', flat=True).first()
+    revisions = []
+    if last is None:
+        last = 1
+        revisions.append(PostRevision(
+            post=post, number=last, created=post.pub_date,
+            is_snapshot=True, data=previous_text))
+    number = last + 1
+    if is_snapshot(number):
+        revision = PostRevision(
+            post=post, number=number, is_snapshot=True, data=post.text)
+    else:
+        revision = PostRevision(
+            post=post, number=number,
+            data=make_diff(previous_text, post.text))
+    if post.edited_at is not None:
+        revision.created = post.edited_at
+    revisions.append(revision)
+    PostRevision.objects.bulk_create(revisions)
+
+
+def revision_text(post, number):
+    """Текст версии `number`: ближайший снимок плюс diff-ы после него."""
+    base = number - (number - 1) % SNAPSHOT_EVERY
+    data = list(
+        post.revisions.filter(number__range=(base, number))
+        .order_by('number').values_list('data', flat=True)
+    )
+    if len(data) != number - base + 1:
+        raise PostRevision.DoesNotExist
+    text = data[0]
+    for diff in data[1:]:
+        text = apply_diff(text, diff)
+    return text
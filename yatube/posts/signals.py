@@ -0,0 +1,128 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.pagecache import invalidate_pages
+
+from .counters import post_counts_changed
+from .detail import forget_author_posts_count, forget_post_detail
+from .feeds import invalidate_feeds
+from .follows import forget_following
+from .group_stats import post_added, post_removed
+from .models import Comment, Follow, Group, Post
+from .revisions import record_revision
+from .trending import record_comment, record_follow
+
+
+def post_group_ids(post):
+    """Текущая группа поста и группа, в которой он был до изменения."""
+    group_ids = {post.group_id, getattr(post, 'loaded_group_id', None)}
+    group_ids.discard(None)
+    return group_ids
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_caches(sender, instance, **kwargs):
+    if instance.is_deleted:
+        # Кэши сброшены при пометке поста удалённым (posts.purge)
+        return
+    group_slugs = Group.objects.filter(
+        pk__in=post_group_ids(instance)).values_list('slug', flat=True)
+    scopes = ['index', f'author:{instance.author.username}']
+    scopes.extend(f'group:{slug}' for slug in group_slugs)
+    invalidate_feeds(scopes)
+    invalidate_pages(scopes + [f'post:{instance.pk}', 'groups'])
+    forget_post_detail(instance.pk)
+    if kwargs.get('created', True):
+        # Создание или удаление меняет число постов автора
+        forget_author_posts_count(instance.author_id)
+        post_counts_changed(scopes)
+    elif instance.group_id != getattr(
+            instance, 'loaded_group_id', instance.group_id):
+        # Пост перенесён в другую группу или убран из неё
+        post_counts_changed(scopes[2:])
+
+
+@receiver(pre_save, sender=Post)
+def mark_post_edited(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    previous_text = getattr(instance, 'loaded_text', None)
+    if previous_text is None:
+        previous_text = Post.objects.filter(pk=instance.pk).values_list(
+            'text', flat=True).first()
+    if previous_text is not None and previous_text != instance.text:
+        instance.edited_at = timezone.now()
+        instance.previous_text = previous_text
+
+
+@receiver(post_save, sender=Post)
+def save_post_revision(sender, instance, raw=False, **kwargs):
+    previous_text = instance.__dict__.pop('previous_text', None)
+    if not raw and previous_text is not None:
+        record_revision(instance, previous_text)
+
+
+@receiver(post_save, sender=Post)
+def count_group_posts(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_group_id = None if created else getattr(
+        instance, 'loaded_group_id', instance.group_id)
+    if previous_group_id == instance.group_id:
+        return
+    if previous_group_id is not None:
+        post_removed(previous_group_id)
+    if instance.group_id is not None:
+        post_added(instance.group_id, instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.is_deleted:
+        return
+    group_id = getattr(instance, 'loaded_group_id', instance.group_id)
+    if group_id is not None:
+        post_removed(group_id)
+
+
+@receiver(post_save, sender=Post)
+def remember_loaded_values(sender, instance, **kwargs):
+    """Сохранённые значения становятся «загруженными» для следующей
+    правки того же объекта. Подключается последним из обработчиков Post."""
+    instance.loaded_group_id = instance.group_id
+    instance.loaded_text = instance.text
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_caches(sender, instance, **kwargs):
+    invalidate_feeds([f'group:{instance.slug}'])
+    invalidate_pages([f'group:{instance.slug}', 'groups'])
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_comment(instance)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    if instance.is_deleted:
+        return
+    invalidate_pages([f'post:{instance.post_id}'])
+    forget_post_detail(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_follow(instance)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_following(sender, instance, **kwargs):
+    forget_following(instance.user_id)
@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from hashlib import md5
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Group, Post, User
+
+SITEMAP_LIMIT = 50000
+CHUNK_SIZE = 2000
+MANIFEST = 'manifest.json'
+INDEX = 'sitemap.xml'
+
+URLSET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_FOOTER = '</urlset>\n'
+
+
+def w3c_date(value):
+    return timezone.localtime(value).date().isoformat() if value else None
+
+
+class Section:
+    """Раздел карты сайта, разбитый на файлы по диапазонам ключа.
+
+    Файл N содержит строки с ключом в [N * limit, (N + 1) * limit), т.е.
+    границы файлов не сдвигаются при удалении строк. Отпечаток файла
+    (количество строк, дата последнего изменения для индекса и точное
+    время изменения) для всех файлов раздела считается одним GROUP BY,
+    и перезаписываются только файлы с изменившимся отпечатком.
+    """
+
+    name = None
+
+    def __init__(self, limit=SITEMAP_LIMIT):
+        self.limit = limit
+
+    def filename(self, bucket):
+        return f'{self.name}-{bucket:05d}.xml.gz'
+
+    def bucket_stats(self, queryset, key, count, last=None):
+        aggregates = {'count': count}
+        if last is not None:
+            aggregates['last'] = last
+        rows = (
+            queryset.order_by()
+            .annotate(bucket=F(key) / self.limit)
+            .values('bucket')
+            .annotate(**aggregates)
+        )
+        return {
+            row['bucket']: [
+                row['count'],
+                w3c_date(row.get('last')),
+                row['last'].isoformat() if row.get('last') else None,
+            ]
+            for row in rows
+        }
+
+    def add_digests(self, stats, rows):
+        """Добавляет к отпечаткам хэш имён в URL из пар (ключ, имя).
+
+        Переименование не меняет ни число строк, ни даты, поэтому без
+        хэша файл со старым URL не перезаписывался бы.
+        """
+        digests = defaultdict(md5)
+        for pk, name in rows.iterator(chunk_size=CHUNK_SIZE):
+            digests[pk // self.limit].update(f'{name}\n'.encode())
+        for bucket, digest in digests.items():
+            if bucket in stats:
+                stats[bucket].append(digest.hexdigest())
+        return stats
+
+    def fingerprints(self):
+        raise NotImplementedError
+
+    def entries(self, bucket):
+        """Пары (путь, lastmod) раздела в порядке ключа."""
+        raise NotImplementedError
+
+    def key_range(self, key, bucket):
+        return {
+            f'{key}__gte': bucket * self.limit,
+            f'{key}__lt': (bucket + 1) * self.limit,
+        }
+
+
+class PostSection(Section):
+    name = 'posts'
+
+    def fingerprints(self):
+        return self.bucket_stats(
+            Post.objects.all(), 'pk', Count('pk'),
+            Max(Coalesce('edited_at', 'pub_date')))
+
+    def entries(self, bucket):
+        # reverse() на каждую из миллионов строк заметно дороже подстановки
+        marker = 999999999
+        pattern = reverse('posts:post_detail', args=(marker,))
+        rows = (
+            Post.objects.filter(**self.key_range('pk', bucket))
+            .order_by('pk')
+            .values_list('pk', 'pub_date', 'edited_at')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for pk, pub_date, edited_at in rows:
+            yield pattern.replace(str(marker), str(pk)), edited_at or pub_date
+
+
+class GroupSection(Section):
+    name = 'groups'
+
+    def fingerprints(self):
+        stats = self.bucket_stats(
+            Group.objects.all(), 'pk', Count('pk'), Max('last_activity'))
+        return self.add_digests(
+            stats, Group.objects.order_by('pk').values_list('pk', 'slug'))
+
+    def entries(self, bucket):
+        rows = (
+            Group.objects.filter(**self.key_range('pk', bucket))
+            .order_by('pk')
+            .values_list('slug', 'last_activity')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for slug, last_activity in rows:
+            yield reverse('posts:group_list', args=(slug,)), last_activity
+
+
+class ProfileSection(Section):
+    """Профили авторов, у которых есть хотя бы один пост."""
+
+    name = 'profiles'
+
+    def fingerprints(self):
+        stats = self.bucket_stats(
+            Post.objects.all(), 'author_id',
+            Count('author_id', distinct=True), Max('pub_date'))
+        authors = User.objects.filter(
+            pk__in=Post.objects.values('author_id'))
+        return self.add_digests(
+            stats, authors.order_by('pk').values_list('pk', 'username'))
+
+    def entries(self, bucket):
+        rows = (
+            User.objects.filter(**self.key_range('pk', bucket))
+            # Скрытые посты не показываются и не сдвигают lastmod
+            .filter(posts__is_deleted=False)
+            .annotate(last_post=Max('posts__pub_date'))
+            .order_by('pk')
+            .values_list('username', 'last_post')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for username, last_post in rows:
+            yield reverse('posts:profile', args=(username,)), last_post
+
+
+SECTIONS = (PostSection, GroupSection, ProfileSection)
+
+
+class SitemapBuilder:
+    """Собирает карту сайта в SITEMAP_ROOT: индекс sitemap.xml и
+    gzip-файлы разделов, отдаваемые веб-сервером как статика."""
+
+    def __init__(self, root=None, limit=SITEMAP_LIMIT):
+        self.root = root or settings.SITEMAP_ROOT
+        self.limit = limit
+        self.base_url = settings.SITE_URL.rstrip('/')
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as manifest:
+                return json.load(manifest)
+        except (OSError, ValueError):
+            return {}
+
+    def write_atomic(self, filename, write):
+        path = os.path.join(self.root, filename)
+        temp_path = f'{path}.tmp'
+        write(temp_path)
+        os.replace(temp_path, path)
+
+    def write_section_file(self, path, entries):
+        with gzip.open(path, 'wt', encoding='utf-8') as sitemap:
+            sitemap.write(URLSET_HEADER)
+            for location, lastmod in entries:
+                sitemap.write(
+                    f'<url><loc>{escape(self.base_url + location)}</loc>')
+                if lastmod is not None:
+                    sitemap.write(f'<lastmod>{w3c_date(lastmod)}</lastmod>')
+                sitemap.write('</url>\n')
+            sitemap.write(URLSET_FOOTER)
+
+    def write_index(self, path, manifest):
+        with open(path, 'w', encoding='utf-8') as index:
+            index.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex '
+                'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            )
+            for filename in sorted(manifest):
+                location = escape(
+                    f'{self.base_url}{settings.SITEMAP_URL}{filename}')
+                index.write(f'<sitemap><loc>{location}</loc>')
+                lastmod = manifest[filename][1]
+                if lastmod:
+                    index.write(f'<lastmod>{lastmod}</lastmod>')
+                index.write('</sitemap>\n')
+            index.write('</sitemapindex>\n')
+
+    def build(self, full=False):
+        """Перезаписывает изменившиеся файлы; возвращает их имена."""
+        os.makedirs(self.root, exist_ok=True)
+        old_manifest = self.load_manifest()
+        manifest, written = {}, []
+        for section_class in SECTIONS:
+            section = section_class(self.limit)
+            for bucket, fingerprint in sorted(section.fingerprints().items()):
+                filename = section.filename(bucket)
+                manifest[filename] = fingerprint
+                if not full and old_manifest.get(filename) == fingerprint:
+                    continue
+                self.write_atomic(
+                    filename,
+                    lambda path: self.write_section_file(
+                        path, section.entries(bucket)),
+                )
+                written.append(filename)
+        for filename in set(old_manifest) - set(manifest):
+            try:
+                os.remove(os.path.join(self.root, filename))
+            except FileNotFoundError:
+                pass
+        self.write_atomic(
+            INDEX, lambda path: self.write_index(path, manifest))
+        self.write_atomic(
+            MANIFEST, lambda path: self.write_manifest(path, manifest))
+        return written
+
+    def write_manifest(self, path, manifest):
+        with open(path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
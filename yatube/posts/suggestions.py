@@ -0,0 +1,97 @@
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.core.cache import cache
+
+from .models import Follow, User
+
+SUGGESTIONS_KEY = 'suggestions:{user_id}'
+SUGGESTIONS_LIMIT = 100
+SUGGESTIONS_TIMEOUT = 60 * 60 * 24
+BATCH_SIZE = 500
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def load_following(user_ids):
+    """Словарь {пользователь: множество авторов} для пачки пользователей."""
+    following = defaultdict(set)
+    for chunk in chunked(user_ids, BATCH_SIZE):
+        pairs = Follow.objects.filter(user_id__in=chunk).values_list(
+            'user_id', 'author_id')
+        for user_id, author_id in pairs:
+            following[user_id].add(author_id)
+    return following
+
+
+def rank_candidates(user_id, following, second_level):
+    """Друзья друзей, отсортированные по числу общих связей."""
+    own = following.get(user_id, set())
+    counter = Counter()
+    for author_id in own:
+        counter.update(second_level.get(author_id, ()))
+    for excluded in own | {user_id}:
+        counter.pop(excluded, None)
+    ranked = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    return [candidate for candidate, _ in ranked[:SUGGESTIONS_LIMIT]]
+
+
+def build_suggestions(batch_size=BATCH_SIZE):
+    """Пересчитывает рекомендации «возможно, вы знакомы» для всех
+    пользователей пачками и складывает их в кэш.
+
+    Запускается периодически (cron, manage.py build_suggestions), в запросе
+    рекомендации только читаются из кэша.
+    """
+    processed = 0
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+    for chunk in chunked(user_ids.iterator(), batch_size):
+        refresh_suggestions(chunk)
+        processed += len(chunk)
+    return processed
+
+
+def refresh_suggestions(user_ids):
+    """Пересчитывает рекомендации для одной пачки пользователей."""
+    following = load_following(user_ids)
+    middle = set().union(*following.values())
+    second_level = load_following(sorted(middle))
+    cache.set_many(
+        {
+            SUGGESTIONS_KEY.format(user_id=user_id): rank_candidates(
+                user_id, following, second_level)
+            for user_id in user_ids
+        },
+        SUGGESTIONS_TIMEOUT,
+    )
+
+
+def get_suggestions(user, after=None, limit=None):
+    """Рекомендованные пользователи из кэша, начиная после `after`.
+
+    Возвращает список пользователей и id последнего из них, если дальше
+    есть ещё рекомендации. Уже отслеживаемые авторы отбрасываются.
+    """
+    suggested_ids = cache.get(SUGGESTIONS_KEY.format(user_id=user.pk), [])
+    if after is not None and after in suggested_ids:
+        suggested_ids = suggested_ids[suggested_ids.index(after) + 1:]
+    if not suggested_ids:
+        return [], None
+    followed = set(
+        Follow.objects.filter(
+            user=user, author_id__in=suggested_ids
+        ).values_list('author_id', flat=True)
+    )
+    suggested_ids = [pk for pk in suggested_ids if pk not in followed]
+    page_ids = suggested_ids[:limit] if limit else suggested_ids
+    users = User.objects.in_bulk(page_ids)
+    people = [users[pk] for pk in page_ids if pk in users]
+    has_more = len(suggested_ids) > len(page_ids)
+    next_after = page_ids[-1] if has_more and page_ids else None
+    return people, next_after
@@ -0,0 +1,70 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from jobs.queue import task
+
+from .counters import refresh_post_counts
+from .models import Comment, Post
+from .notifications import notify_followers, notify_post_author
+from .purge import purge_deleted, purge_user
+from .suggestions import refresh_suggestions
+from .trending import refresh_trending
+
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+THUMBNAIL_GEOMETRY = '960x339'
+
+
+@task(name='posts.make_thumbnail')
+def make_thumbnail(post_id):
+    """Готовит превью картинки поста заранее, а не на первом показе."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@task(name='posts.refresh_suggestions')
+def refresh_user_suggestions(user_id):
+    """Обновляет рекомендации пользователя после изменения подписок."""
+    refresh_suggestions([user_id])
+
+
+@task(name='posts.notify_followers')
+def notify_about_post(post_id):
+    """Уведомления подписчикам автора о новом посте."""
+    post = Post.objects.filter(pk=post_id).only('pk', 'author_id').first()
+    if post is not None:
+        notify_followers(post)
+
+
+@task(name='posts.notify_post_author')
+def notify_about_comment(comment_id):
+    """Уведомление автору поста о новом комментарии."""
+    comment = Comment.objects.filter(pk=comment_id).first()
+    if comment is not None:
+        notify_post_author(comment)
+
+
+@task(name='posts.refresh_trending', max_attempts=1)
+def refresh_trending_lists():
+    """Периодический пересчёт вкладки «Популярное» (JOBS_PERIODIC)."""
+    refresh_trending()
+
+
+@task(name='posts.refresh_counts', max_attempts=1)
+def refresh_counts(scopes=('index',)):
+    """Пересчёт числа постов списков для пагинации. Без аргументов
+    (JOBS_PERIODIC) - главной страницы, чтобы её COUNT(*) не попадал
+    на запрос и после истечения записи в кэше."""
+    refresh_post_counts(scopes)
+
+
+@task(name='posts.purge_deleted', max_attempts=3)
+def purge_deleted_content():
+    """Удаление помеченных постов и комментариев (после soft delete и
+    периодически - на случай сбоя предыдущего запуска)."""
+    purge_deleted(settings.PURGE_CHUNK_SIZE)
+
+
+@task(name='posts.purge_user', max_attempts=3)
+def purge_deleted_user(user_id):
+    purge_user(user_id, settings.PURGE_CHUNK_SIZE)
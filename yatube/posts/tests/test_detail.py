@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from core.sessions import SessionStore
+from posts.models import Comment, Group, Post, User
+from users import cache as user_cache
+
+
+class PostDetailCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+        Post.objects.create(author=cls.author, text='Второй пост')
+        for number in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {number}')
+
+    def setUp(self):
+        cache.clear()
+        SessionStore.local.clear()
+        user_cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def test_detail_is_read_in_two_queries(self):
+        """.Проверяем: пост, автор, группа и счётчик - один запрос,
+        комментарии - второй, повторно страница в БД за ними не ходит."""
+        self.client.get(reverse('posts:index'))
+        # Сессия, пользователь и подписки уже в кэше
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['author_posts_count'], 2)
+        self.assertEqual(len(response.context['comments']), 3)
+        self.assertEqual(response.context['post'].group.title,
+                         'Тестовая группа')
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_detail_is_invalidated(self):
+        """.Проверяем сброс кэша при правке, комментарии и новом посте."""
+        self.client.get(self.url)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий')
+        Post.objects.create(author=self.author, text='Третий пост')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['post'].text, 'Исправленный пост')
+        self.assertEqual(len(response.context['comments']), 4)
+        self.assertEqual(response.context['author_posts_count'], 3)
+        self.assertContains(response, 'Новый комментарий')
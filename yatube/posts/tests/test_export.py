@@ -0,0 +1,92 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'),
+        )
+        Post.objects.create(author=cls.other, text='Чужой пост')
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Свой комментарий')
+        Follow.objects.create(user=cls.user, author=cls.other)
+        Follow.objects.create(user=cls.other, author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:profile_export', args=('auth',))
+
+    def read_rows(self, body):
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_ndjson_export(self):
+        """.Проверяем потоковую выгрузку данных пользователя в NDJSON."""
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        rows = self.read_rows(b''.join(response.streaming_content))
+        self.assertEqual(
+            [row['type'] for row in rows],
+            ['post', 'comment', 'following', 'follower'],
+        )
+        self.assertEqual(rows[0]['text'], 'Пост с картинкой')
+        self.assertEqual(rows[0]['group__slug'], 'test-slug')
+        self.assertEqual(rows[2]['author__username'], 'other')
+        self.assertEqual(rows[3]['user__username'], 'other')
+
+    def test_zip_export_contains_images(self):
+        """.Проверяем ZIP-выгрузку вместе с картинками постов."""
+        response = self.client.get(self.url, {'format': 'zip'})
+        body = b''.join(response.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertEqual(
+                len(self.read_rows(archive.read('data.ndjson'))), 4)
+            self.assertEqual(
+                archive.read(f'images/{self.post.image.name}'), SMALL_GIF)
+
+    def test_export_of_other_user_is_forbidden(self):
+        """.Проверяем, что чужие данные выгрузить нельзя."""
+        response = self.client.get(
+            reverse('posts:profile_export', args=('other',)))
+        self.assertRedirects(
+            response, reverse('posts:profile', args=('other',)))
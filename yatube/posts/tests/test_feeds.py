@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+
+class FeedTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Другое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост в ленте')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_feeds_are_available(self):
+        """.Проверяем ленты сайта, группы и автора в RSS и Atom."""
+        urls = (
+            reverse('posts:feed'),
+            reverse('posts:feed_atom'),
+            reverse('posts:group_feed', args=('test-slug',)),
+            reverse('posts:group_feed_atom', args=('test-slug',)),
+            reverse('posts:author_feed', args=('auth',)),
+            reverse('posts:author_feed_atom', args=('auth',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Пост в ленте', response.content.decode())
+
+    def test_cached_feed_costs_no_queries(self):
+        """.Проверяем, что повторная отдача ленты не обращается к БД."""
+        url = reverse('posts:group_feed', args=('test-slug',))
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_conditional_get(self):
+        """.Проверяем ответ 304 на If-None-Match."""
+        url = reverse('posts:feed')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_feeds_invalidated_on_post_edit(self):
+        """.Проверяем сброс лент обеих групп при переносе поста."""
+        old_url = reverse('posts:group_feed', args=('test-slug',))
+        new_url = reverse('posts:group_feed', args=('other-slug',))
+        self.client.get(old_url)
+        self.client.get(new_url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertNotIn(
+            'Пост в ленте', self.client.get(old_url).content.decode())
+        self.assertIn(
+            'Пост в ленте', self.client.get(new_url).content.decode())
+
+    def test_unknown_group_feed(self):
+        """.Проверяем 404 для ленты несуществующей группы."""
+        response = self.client.get(
+            reverse('posts:group_feed', args=('no-such-group',)))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.group_stats import rebuild_group_stats
+from posts.models import Group, Post, User
+
+GROUPS_COUNT = 13
+
+
+class GroupDirectoryTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number:02d}',
+                slug=f'group-{number}',
+                description='Описание группы',
+            )
+            for number in range(GROUPS_COUNT)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_counters_follow_posts(self):
+        """.Проверяем счётчики при создании, переносе и удалении поста."""
+        first, second = self.groups[:2]
+        post = Post.objects.create(
+            author=self.user, group=first, text='Пост в группе')
+        first.refresh_from_db()
+        self.assertEqual(first.posts_count, 1)
+        self.assertEqual(first.last_activity, post.pub_date)
+        post.group = second
+        post.save()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.posts_count, second.posts_count), (0, 1))
+        Post.objects.get(pk=post.pk).delete()
+        second.refresh_from_db()
+        self.assertEqual(second.posts_count, 0)
+
+    def test_rebuild_group_stats(self):
+        """.Проверяем пересчёт счётчиков после записи в обход сигналов."""
+        Post.objects.bulk_create(
+            [Post(author=self.user, group=self.groups[3], text='Пост')] * 3)
+        rebuild_group_stats([self.groups[3].pk])
+        self.assertEqual(
+            Group.objects.get(pk=self.groups[3].pk).posts_count, 3)
+
+    def test_directory_sorting_and_pages(self):
+        """.Проверяем сортировку каталога и постраничный вывод по ключу."""
+        Post.objects.create(
+            author=self.user, group=self.groups[0], text='Свежий пост')
+        url = reverse('posts:groups')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'][0], self.groups[0])
+        response = self.client.get(url, {'sort': 'title'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), self.groups[:10])
+        response = self.client.get(
+            url, {'sort': 'title', 'after': page_obj.next_cursor})
+        self.assertEqual(list(response.context['page_obj']), self.groups[10:])
+
+    def test_pages_with_sub_millisecond_ties(self):
+        """.Проверяем курсор при равном с точностью до мкс last_activity."""
+        for number in range(GROUPS_COUNT, 15):
+            Group.objects.create(
+                title=f'Группа {number:02d}', slug=f'group-{number}',
+                description='Описание группы')
+        moment = timezone.now().replace(microsecond=123456)
+        Group.objects.update(last_activity=moment)
+        url = reverse('posts:groups')
+        page_obj = self.client.get(url).context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        response = self.client.get(url, {'after': page_obj.next_cursor})
+        self.assertEqual(len(response.context['page_obj']), 5)
@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from posts.importer import Importer
+from posts.models import Comment, Group, Post, User
+
+
+class ImportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+
+    def lines(self, rows):
+        return [json.dumps(row) for row in rows]
+
+    def test_import_posts_and_comments(self):
+        """.Проверяем импорт постов и комментариев с исходными датами."""
+        rows = [
+            {
+                'type': 'post', 'id': number, 'author': 'auth',
+                'group__slug': 'test-slug', 'text': f'Старый пост {number}',
+                'pub_date': '2015-03-0{}T10:00:00+00:00'.format(number + 1),
+            }
+            for number in range(5)
+        ]
+        rows.append({
+            'type': 'comment', 'post_id': 4, 'author': 'newcomer',
+            'text': 'Старый комментарий', 'created': '2015-04-01T10:00:00',
+        })
+        stats = Importer(create_authors=True, chunk_size=2).run(
+            self.lines(rows))
+        self.assertEqual(stats['posts'], 5)
+        self.assertEqual(stats['comments'], 1)
+        self.assertEqual(stats['authors'], 1)
+        self.assertEqual(self.group.posts.count(), 5)
+        self.assertEqual(
+            Post.objects.get(text='Старый пост 0').pub_date,
+            datetime(2015, 3, 1, 10, tzinfo=timezone.utc),
+        )
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post.text, 'Старый пост 4')
+        self.assertEqual(comment.author.username, 'newcomer')
+        self.assertEqual(comment.created.year, 2015)
+
+    def test_unknown_rows_are_skipped(self):
+        """.Проверяем пропуск строк с неизвестным автором или постом."""
+        rows = [
+            {'type': 'post', 'author': 'nobody', 'text': 'Без автора'},
+            {'type': 'comment', 'post_id': 100, 'text': 'Без поста'},
+            {'type': 'post', 'text': 'Пост автора по умолчанию'},
+        ]
+        stats = Importer(default_author='auth').run(self.lines(rows))
+        self.assertEqual(stats['posts'], 1)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertFalse(User.objects.filter(username='nobody').exists())
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+
+    def test_repeated_import_links_comments_to_new_posts(self):
+        """.Проверяем id постов от БД при повторном импорте того же файла."""
+        rows = [
+            {
+                'type': 'post', 'id': number, 'author': 'auth',
+                'text': 'Одинаковый пост', 'pub_date': '2015-03-01T10:00:00',
+            }
+            for number in range(2)
+        ] + [
+            {'type': 'comment', 'post_id': number, 'author': 'auth',
+             'text': f'Комментарий {number}'}
+            for number in range(2)
+        ]
+        for _ in range(2):
+            Importer().run(self.lines(rows))
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(
+            len(set(Comment.objects.values_list('post_id', flat=True))), 4)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from posts.media_gc import collect_orphans
+from posts.models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+OLD = time.time() - 2 * 60 * 60
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaGarbageCollectorTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        author = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(
+            author=author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('kept.gif', b'GIF89a kept'),
+        )
+        posts_dir = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+        self.orphan = os.path.join(posts_dir, 'old', 'orphan.gif')
+        self.fresh = os.path.join(posts_dir, 'fresh.gif')
+        os.makedirs(os.path.dirname(self.orphan), exist_ok=True)
+        for path in (self.orphan, self.fresh):
+            with open(path, 'wb') as image:
+                image.write(b'x' * 100)
+        for path in (self.orphan, self.post.image.path):
+            os.utime(path, (OLD, OLD))
+
+    def test_dry_run_only_reports(self):
+        """.Проверяем, что dry-run считает байты, но ничего не удаляет."""
+        stats = collect_orphans('posts/', dry_run=True, workers=1)
+        self.assertEqual(stats['files'], 2)
+        self.assertEqual((stats['orphans'], stats['bytes']), (1, 100))
+        self.assertTrue(os.path.exists(self.orphan))
+
+    def test_report_runs_in_calling_thread(self):
+        """.Проверяем, что отчёт пишется из вызывающего потока."""
+        reported = []
+        collect_orphans(
+            'posts/', dry_run=True, workers=3, batch_size=1,
+            report=lambda name: reported.append(
+                (name, threading.get_ident())))
+        self.assertIn('posts/old/orphan.gif', [name for name, _ in reported])
+        self.assertEqual(
+            {ident for _, ident in reported}, {threading.get_ident()})
+
+    def test_orphans_are_removed(self):
+        """.Проверяем удаление только старых файлов без поста."""
+        out = StringIO()
+        call_command(
+            'gc_media', workers=1, verbosity=2, stdout=out)
+        self.assertIn('posts/old/orphan.gif', out.getvalue())
+        self.assertFalse(os.path.exists(self.orphan))
+        self.assertTrue(os.path.exists(self.fresh))
+        self.assertTrue(os.path.exists(self.post.image.path))
@@ -0,0 +1,74 @@
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Follow, Notification, Post, User
+from posts.notifications import notify_followers, send_digests, unread_count
+
+FOLLOWERS_COUNT = 30
+
+
+@override_settings(JOBS_EAGER=True)
+class NotificationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.followers = [
+            User.objects.create_user(
+                username=f'follower{i}', email=f'follower{i}@yatube.ru')
+            for i in range(FOLLOWERS_COUNT)
+        ]
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(NotificationTests.author)
+        cache.clear()
+
+    def test_new_post_notifies_followers_with_one_insert(self):
+        """.Проверяем, что уведомления о посте пишутся одним INSERT."""
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        with self.assertNumQueries(2):  # подписчики + bulk INSERT
+            notify_followers(post)
+        self.assertEqual(
+            Notification.objects.filter(post=post).count(), FOLLOWERS_COUNT)
+
+    def test_views_create_notifications(self):
+        """.Проверяем уведомления после создания поста и комментария."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Пост подписчикам'})
+        post = Post.objects.get(text='Пост подписчикам')
+        self.assertEqual(post.notifications.count(), FOLLOWERS_COUNT)
+        follower_client = Client()
+        follower_client.force_login(self.followers[0])
+        follower_client.post(
+            reverse('posts:add_comment', args=(post.pk,)),
+            {'text': 'Комментарий'}
+        )
+        self.assertTrue(Notification.objects.filter(
+            recipient=self.author, kind=Notification.NEW_COMMENT).exists())
+
+    def test_unread_count_is_cached_and_reset(self):
+        """.Проверяем кэширование счётчика и его сброс при просмотре."""
+        follower = self.followers[0]
+        notify_followers(Post.objects.create(author=self.author, text='1'))
+        self.assertEqual(unread_count(follower), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(follower), 1)
+        client = Client()
+        client.force_login(follower)
+        client.get(reverse('posts:notifications'))
+        self.assertEqual(unread_count(follower), 0)
+
+    def test_digests_are_sent_once_per_recipient(self):
+        """.Проверяем, что дайджест собирает все события получателя."""
+        for number in range(3):
+            notify_followers(
+                Post.objects.create(author=self.author, text=f'Пост {number}'))
+        self.assertEqual(send_digests(batch_size=7), FOLLOWERS_COUNT)
+        self.assertEqual(len(mail.outbox), FOLLOWERS_COUNT)
+        self.assertIn('новых событий - 3', mail.outbox[0].subject)
+        self.assertEqual(send_digests(), 0)
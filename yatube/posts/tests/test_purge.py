@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from jobs.models import Job
+from posts.models import Comment, Follow, Group, Notification, Post, User
+from posts.notifications import unread_count
+from posts.purge import (purge_deleted, purge_user, soft_delete_comments,
+                         soft_delete_posts, soft_delete_user)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SoftDeleteTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='purge-group', description='Описание')
+        self.post = Post.objects.create(
+            author=self.author,
+            group=self.group,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                'purge.gif', SMALL_GIF, content_type='image/gif'),
+        )
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+
+    def test_deleted_post_is_hidden_until_purge(self):
+        """.Проверяем, что помеченный пост сразу скрыт, а очередь удаляет
+        его вместе с комментариями и картинкой."""
+        image_path = self.post.image.path
+        self.assertEqual(soft_delete_posts(
+            Post.objects.filter(pk=self.post.pk)), 1)
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,)))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+        stats = purge_deleted(chunk_size=1)
+        self.assertEqual(
+            (stats['posts'], stats['comments'], stats['images']), (1, 1, 1))
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertFalse(os.path.exists(image_path))
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+
+    def test_deleted_post_leaves_notifications(self):
+        """.Проверяем, что уведомления о помеченном посте не показываются."""
+        Notification.objects.create(
+            recipient=self.reader, actor=self.author,
+            kind=Notification.NEW_POST, post=self.post)
+        self.assertEqual(unread_count(self.reader), 1)
+        soft_delete_posts(Post.objects.filter(pk=self.post.pk))
+        cache.clear()
+        self.assertEqual(unread_count(self.reader), 0)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_deleted_comment_is_hidden(self):
+        """.Проверяем скрытие и удаление комментария."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.assertContains(self.client.get(url), 'Комментарий')
+        soft_delete_comments(Comment.objects.filter(pk=self.comment.pk))
+        self.assertNotContains(self.client.get(url), 'Комментарий')
+        self.assertEqual(purge_deleted(chunk_size=10)['comments'], 1)
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_user_is_deactivated_then_purged(self):
+        """.Проверяем удаление пользователя: сначала деактивация и скрытие
+        контента, затем удаление пачками."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.author, author=self.reader)
+        soft_delete_user(self.author)
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertFalse(Post.objects.filter(author=self.author).exists())
+        stats = purge_user(self.author.pk, chunk_size=1)
+        self.assertEqual((stats['posts'], stats['follows']), (1, 2))
+        self.assertFalse(User.objects.filter(username='auth').exists())
+        self.assertTrue(User.objects.filter(username='reader').exists())
+
+    def test_user_deleted_again_is_purged_again(self):
+        """.Проверяем, что повторное удаление пользователя ставит новую
+        задачу, а не склеивается с выполненной."""
+        with mock.patch('posts.purge.time.time', return_value=1000.0):
+            soft_delete_user(self.author)
+        Job.objects.update(status=Job.DONE)
+        User.objects.filter(pk=self.author.pk).update(is_active=True)
+        with mock.patch('posts.purge.time.time', return_value=2000.0):
+            soft_delete_user(self.author)
+        self.assertEqual(
+            Job.objects.filter(
+                name='posts.purge_user', status=Job.PENDING).count(),
+            1,
+        )
+
+    def test_active_user_is_not_purged(self):
+        """.Проверяем, что активного пользователя задача не удаляет."""
+        purge_user(self.author.pk, chunk_size=10)
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
+
+    def test_admin_delete_marks_post(self):
+        """.Проверяем, что удаление в админке только помечает пост."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.client.post(
+            reverse('admin:posts_post_delete', args=(self.post.pk,)),
+            {'post': 'yes'})
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(
+            Post.all_objects.filter(pk=self.post.pk, is_deleted=True).exists())
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.sessions import SessionStore
+from posts.models import Comment, Follow, Group, Post, User
+from users import cache as user_cache
+
+POSTS_PER_AUTHOR = 12
+# Запросы страницы при пустых кэшах, включая сессию, пользователя и его
+# подписки; число постов на странице на бюджет влиять не должно
+QUERY_BUDGETS = {
+    'posts:index': 6,
+    'posts:group_list': 7,
+    'posts:profile': 7,
+    'posts:follow_index': 6,
+    'posts:post_detail': 6,
+    'posts:trending': 8,
+    'posts:feed': 1,
+}
+
+
+class PostQuerySetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='budget-group', description='Описание')
+        cls.authors = []
+        for i in range(3):
+            author = User.objects.create_user(username=f'author{i}')
+            cls.authors.append(author)
+            Follow.objects.create(user=cls.reader, author=author)
+            for _ in range(POSTS_PER_AUTHOR):
+                post = Post.objects.create(
+                    author=author, group=cls.group, text='Текст поста')
+                Comment.objects.create(
+                    post=post, author=cls.reader, text='Комментарий')
+        cls.post = post
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(PostQuerySetTests.reader)
+
+    def clear_caches(self):
+        cache.clear()
+        SessionStore.local.clear()
+        user_cache.clear()
+
+    def budget_urls(self):
+        return {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=(self.group.slug,)),
+            'posts:profile': reverse(
+                'posts:profile', args=(self.authors[0].username,)),
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=(self.post.pk,)),
+            'posts:trending': reverse('posts:trending'),
+            'posts:feed': reverse('posts:feed'),
+        }
+
+    def test_pages_stay_within_query_budget(self):
+        """.Проверяем, что страницы с постами укладываются в бюджет
+        запросов при пустых кэшах."""
+        for name, url in self.budget_urls().items():
+            with self.subTest(page=name):
+                self.clear_caches()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(queries), QUERY_BUDGETS[name])
+
+    def test_list_posts_defer_unused_fields(self):
+        """.Проверяем, что в списках не читаются лишние поля."""
+        post = Post.objects.for_list().first()
+        deferred = post.get_deferred_fields()
+        self.assertIn('edited_at', deferred)
+        self.assertNotIn('text', deferred)
+        with self.assertNumQueries(0):
+            post.author.username
+            post.group.slug
+
+    def test_feed_for_uses_follow_set(self):
+        """.Проверяем ленту подписок и сброс кэша подписок."""
+        feed = Post.objects.feed_for(self.reader)
+        self.assertEqual(feed.count(), 3 * POSTS_PER_AUTHOR)
+        Follow.objects.filter(
+            user=self.reader, author=self.authors[0]).delete()
+        feed = Post.objects.feed_for(self.reader)
+        self.assertEqual(feed.count(), 2 * POSTS_PER_AUTHOR)
@@ -0,0 +1,75 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Post, PostRevision, User
+from posts.revisions import (SNAPSHOT_EVERY, apply_diff, make_diff,
+                             revision_text)
+
+
+class RevisionTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.post = Post.objects.create(author=self.user, text='Первый текст')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_diff_round_trip(self):
+        """.Проверяем, что diff восстанавливает новый текст."""
+        pairs = (
+            ('', 'Новый текст'),
+            ('Старый текст, длинный.', ''),
+            ('Один два три', 'Один, два и три!\nЧетыре'),
+        )
+        for old, new in pairs:
+            with self.subTest(old=old, new=new):
+                self.assertEqual(apply_diff(old, make_diff(old, new)), new)
+
+    def test_diff_size_depends_on_edit(self):
+        """.Проверяем, что размер diff-а не зависит от длины поста."""
+        text = 'Длинный пост. ' * 1000
+        diff = make_diff(text, text.replace('Длинный', 'Короткий', 1))
+        self.assertLess(len(diff), 50)
+
+    def test_every_revision_is_restored(self):
+        """.Проверяем восстановление всех версий после многих правок."""
+        texts = ['Первый текст']
+        for number in range(SNAPSHOT_EVERY * 2 + 3):
+            self.post.text = f'{texts[-1]} правка {number}'
+            self.post.save()
+            texts.append(self.post.text)
+        self.assertIsNotNone(self.post.edited_at)
+        self.assertEqual(self.post.revisions.count(), len(texts))
+        self.assertEqual(
+            self.post.revisions.filter(is_snapshot=True).count(), 3)
+        for number, text in enumerate(texts, start=1):
+            with self.subTest(number=number):
+                self.assertEqual(revision_text(self.post, number), text)
+
+    def test_save_without_text_change_keeps_history(self):
+        """.Проверяем, что сохранение без правки текста не создаёт версию."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.save()
+        self.assertIsNone(post.edited_at)
+        self.assertFalse(PostRevision.objects.exists())
+
+    def test_history_page(self):
+        """.Проверяем страницу истории и доступ к ней."""
+        self.client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            {'text': 'Второй текст'},
+        )
+        url = reverse('posts:post_history', args=(self.post.pk,))
+        response = self.client.get(url, {'version': 1})
+        self.assertEqual(response.context['text'], 'Первый текст')
+        self.assertEqual(len(response.context['page_obj']), 2)
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        self.assertRedirects(
+            reader_client.get(url),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
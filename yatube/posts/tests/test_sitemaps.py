@@ -0,0 +1,109 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase
+from posts.models import Group, Post, User
+from posts.sitemaps import INDEX, SitemapBuilder
+
+TEMP_SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+class SitemapTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+            for number in range(4)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SITEMAP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_SITEMAP_ROOT, ignore_errors=True)
+        self.builder = SitemapBuilder(root=TEMP_SITEMAP_ROOT, limit=2)
+
+    def read(self, filename):
+        with gzip.open(
+                os.path.join(TEMP_SITEMAP_ROOT, filename), 'rt') as sitemap:
+            return sitemap.read()
+
+    def test_build_writes_index_and_sections(self):
+        """.Проверяем, что карта сайта содержит посты, группы и профили."""
+        written = self.builder.build()
+        with open(os.path.join(TEMP_SITEMAP_ROOT, INDEX)) as index:
+            index_body = index.read()
+        for filename in written:
+            self.assertIn(filename, index_body)
+        posts = ''.join(
+            self.read(filename) for filename in written
+            if filename.startswith('posts-')
+        )
+        for post in self.posts:
+            self.assertIn(f'/posts/{post.pk}/</loc>', posts)
+        self.assertIn('/group/test-slug/', self.read('groups-00000.xml.gz'))
+        self.assertIn('/profile/auth/', self.read(
+            f'profiles-{self.user.pk // 2:05d}.xml.gz'))
+
+    def test_rebuild_rewrites_only_changed_files(self):
+        """.Проверяем, что перезаписываются только изменившиеся файлы."""
+        self.builder.build()
+        self.assertEqual(self.builder.build(), [])
+        deleted_pk = self.posts[0].pk
+        self.posts[0].delete()
+        written = self.builder.build()
+        self.assertNotIn(f'posts-{self.posts[-1].pk // 2:05d}.xml.gz', written)
+        filename = f'posts-{deleted_pk // 2:05d}.xml.gz'
+        if filename in written:
+            self.assertNotIn(f'/posts/{deleted_pk}/<', self.read(filename))
+        else:
+            # В диапазоне не осталось постов - файл удалён
+            self.assertNotIn(filename, os.listdir(TEMP_SITEMAP_ROOT))
+        self.assertEqual(
+            len(self.builder.build(full=True)), len(os.listdir(
+                TEMP_SITEMAP_ROOT)) - 2)
+
+    def test_renamed_group_and_edited_post_are_rewritten(self):
+        """.Проверяем перезапись файлов при смене slug и правке поста."""
+        self.builder.build()
+        Group.objects.filter(pk=self.group.pk).update(slug='renamed')
+        groups_file = f'groups-{self.group.pk // 2:05d}.xml.gz'
+        self.assertEqual(self.builder.build(), [groups_file])
+        self.assertIn('/group/renamed/', self.read(groups_file))
+        post = self.posts[1]
+        Post.objects.filter(pk=post.pk).update(
+            edited_at=post.pub_date + timedelta(days=400))
+        posts_file = f'posts-{post.pk // 2:05d}.xml.gz'
+        self.assertEqual(self.builder.build(), [posts_file])
+        self.assertIn(
+            (post.pub_date + timedelta(days=400)).date().isoformat(),
+            self.read(posts_file))
+
+    def test_renamed_author_is_rewritten(self):
+        """.Проверяем перезапись профилей при смене имени и без скрытых
+        постов в lastmod."""
+        self.builder.build()
+        User.objects.filter(pk=self.user.pk).update(username='renamed')
+        profiles_file = f'profiles-{self.user.pk // 2:05d}.xml.gz'
+        self.assertEqual(self.builder.build(), [profiles_file])
+        self.assertIn('/profile/renamed/', self.read(profiles_file))
+        hidden = Post.objects.create(author=self.user, text='Скрытый пост')
+        Post.all_objects.filter(pk=hidden.pk).update(
+            is_deleted=True, pub_date=hidden.pub_date + timedelta(days=400))
+        self.builder.build(full=True)
+        self.assertNotIn(
+            (hidden.pub_date + timedelta(days=400)).date().isoformat(),
+            self.read(profiles_file))
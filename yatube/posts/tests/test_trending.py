@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from posts.models import Comment, Follow, Group, Post, TrendingActivity, User
+from posts.trending import add_activity, compute_trending, refresh_trending
+
+
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.quiet_post = Post.objects.create(
+            author=cls.reader, text='Тихий пост')
+        cls.hot_post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Обсуждаемый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_comments_and_follows_update_counters(self):
+        """.Проверяем, что комментарии и подписки увеличивают счётчики."""
+        for _ in range(3):
+            Comment.objects.create(
+                post=self.hot_post, author=self.reader, text='Комментарий')
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(
+            TrendingActivity.objects.get(
+                kind='post', object_id=self.hot_post.pk).activity,
+            5,
+        )
+        self.assertEqual(
+            TrendingActivity.objects.get(
+                kind='group', object_id=self.group.pk).activity,
+            5,
+        )
+        trending = refresh_trending()
+        self.assertEqual(trending['post'], [self.hot_post.pk])
+        self.assertEqual(trending['group'], [self.group.pk])
+
+    def test_old_activity_decays(self):
+        """.Проверяем затухание старой активности и очистку счётчиков."""
+        now = timezone.now()
+        add_activity('post', self.quiet_post.pk, 10, now - timedelta(
+            hours=48))
+        add_activity('post', self.hot_post.pk, 3, now)
+        self.assertEqual(
+            compute_trending(now)['post'],
+            [self.hot_post.pk, self.quiet_post.pk],
+        )
+        refresh_trending(now + timedelta(hours=72))
+        self.assertEqual(TrendingActivity.objects.count(), 1)
+
+    def test_trending_page(self):
+        """.Проверяем вкладку «Популярное»."""
+        Comment.objects.create(
+            post=self.hot_post, author=self.reader, text='Комментарий')
+        add_activity('post', self.quiet_post.pk, 1, timezone.now() - timedelta(
+            hours=100))
+        response = self.client.get(reverse('posts:trending'))
+        # При промахе кэша запрос только ставит пересчёт в очередь
+        self.assertEqual(list(response.context['page_obj']), [])
+        self.assertTrue(
+            Job.objects.filter(name='posts.refresh_trending').exists())
+        self.assertEqual(TrendingActivity.objects.count(), 3)
+        refresh_trending()
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']), [self.hot_post])
+        self.assertEqual(response.context['groups'], [self.group])
+        self.assertContains(response, reverse('posts:trending'))
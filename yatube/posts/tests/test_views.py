@@ -1,13 +1,22 @@
 import shutil
 import tempfile
+import warnings
+from io import StringIO
 from time import sleep
 
 from django import forms
 from django.conf import settings
 from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from core.sessions import SessionStore
+from users import cache as user_cache
+from posts.counters import count_key, refresh_post_counts
 from posts.models import Follow, Group, Post, User
 from posts.views import LIST_LIMIT
 
@@ -201,14 +210,19 @@ class PostPagesTests(TestCase):
         self.assertEqual(new_comment, data['text'])
 
     def test_cache_for_the_index_page(self):
-        """.Проверяем кэширование главной страницы."""
+        """.Главная страница для анонимов кэшируется до нового поста."""
         response1 = self.guest_client.get(reverse('posts:index'))
-        Post.objects.all().order_by('-id')[0].delete()  # удаляем самый свежий
+        # update() не шлёт сигналов, кэш страницы не сбрасывается
+        Post.objects.filter(pk=self.post.pk).update(text='Правка без сигнала')
         response2 = self.guest_client.get(reverse('posts:index'))
         self.assertEqual(response1.content, response2.content)
-        cache.clear()
-        response3 = self.guest_client.get(reverse('posts:index'))
-        self.assertNotEqual(response1.content, response3.content)
+        Post.objects.create(author=self.user, text='Первый новый пост')
+        self.guest_client.get(reverse('posts:index'))
+        Post.objects.create(author=self.user, text='Второй новый пост')
+        for client in (self.guest_client, self.authorized_client):
+            with self.subTest(client=client):
+                response = client.get(reverse('posts:index'))
+                self.assertContains(response, 'Второй новый пост')
 
     def test_new_post_displayed_for_followers(self):
         """.Проверяем показ нового поста для подписчиков и для нормальных."""
@@ -253,3 +267,203 @@ class PostPagesTests(TestCase):
             'posts:profile_follow', kwargs={'username': 'auth'}))
         self.assertFalse(
             Follow.objects.filter(user=self.user, author=self.user).exists())
+
+
+class FollowListsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(1, 26)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        for author in cls.authors:
+            Follow.objects.create(user=cls.friend, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(FollowListsTests.user)
+        cache.clear()
+
+    def test_following_list_is_keyset_paginated(self):
+        """.Проверяем постраничный вывод подписок по курсору."""
+        url = reverse('posts:profile_following', args=('friend',))
+        response = self.client.get(url)
+        page_obj = response.context['page_obj']
+        first_page = response.context['people']
+        self.assertEqual(len(first_page), 20)
+        self.assertEqual(first_page[0], self.authors[-1])
+        response = self.client.get(url, {'after': page_obj.next_cursor})
+        second_page = response.context['people']
+        self.assertEqual(len(second_page), 5)
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertFalse(set(first_page) & set(second_page))
+
+    def test_followers_list(self):
+        """.Проверяем список подписчиков автора."""
+        response = self.client.get(
+            reverse('posts:profile_followers', args=('author1',)))
+        self.assertEqual(response.context['people'], [self.friend])
+
+    def test_suggestions_are_read_from_precomputed_cache(self):
+        """.Проверяем рекомендации друзей друзей после пакетного расчёта."""
+        response = self.client.get(reverse('posts:suggestions'))
+        self.assertEqual(response.context['people'], [])
+        call_command('build_suggestions', stdout=StringIO())
+        response = self.client.get(reverse('posts:suggestions'))
+        people = response.context['people']
+        self.assertEqual(len(people), 20)
+        self.assertNotIn(self.friend, people)
+        response = self.client.get(
+            reverse('posts:suggestions'),
+            {'after': response.context['next_after']}
+        )
+        self.assertEqual(len(response.context['people']), 5)
+
+
+class FollowButtonsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(1, 6)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text='Пост автора')
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(FollowButtonsTests.user)
+        cache.clear()
+
+    def test_followed_ids_in_list_context(self):
+        """.Проверяем множество отслеживаемых авторов в контексте ленты."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            response.context['followed_ids'], {self.authors[0].pk})
+
+    def test_follow_lookup_does_not_depend_on_authors_count(self):
+        """.Проверяем, что число запросов не растёт с числом авторов."""
+        with CaptureQueriesContext(connection) as few_authors:
+            self.client.get(reverse('posts:index') + '?page=1')
+        for i in range(6, 10):
+            author = User.objects.create_user(username=f'author{i}')
+            Post.objects.create(author=author, text='Ещё пост')
+        cache.clear()
+        SessionStore.local.clear()
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as more_authors:
+            self.client.get(reverse('posts:index') + '?page=1')
+        self.assertEqual(len(few_authors), len(more_authors))
+
+    def test_buttons_are_not_shared_between_users(self):
+        """.Проверяем, что кнопки подписки не попадают к другому читателю."""
+        unfollow_url = reverse(
+            'posts:profile_unfollow', args=(self.authors[0].username,))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, unfollow_url)
+        other = User.objects.create_user(username='other_reader')
+        other_client = Client()
+        other_client.force_login(other)
+        response = other_client.get(reverse('posts:index'))
+        self.assertNotContains(response, unfollow_url)
+
+    def test_unfollow_without_follow(self):
+        """.Проверяем отписку от автора, на которого нет подписки."""
+        url = reverse('posts:profile_unfollow', args=('author2',))
+        response = self.client.get(url, {'next': '/group/any/'})
+        self.assertRedirects(
+            response, '/group/any/', fetch_redirect_response=False)
+        self.assertEqual(
+            Follow.objects.filter(user=self.user).count(), 1)
+
+    def test_follow_button_redirects_back(self):
+        """.Проверяем возврат на исходную страницу после подписки."""
+        url = reverse('posts:profile_follow', args=('author2',))
+        response = self.client.get(url, {'next': '/group/any/'})
+        self.assertRedirects(
+            response, '/group/any/', fetch_redirect_response=False)
+
+
+class FollowFeedQueriesTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа ленты', slug='feed-group', description='Описание')
+        for i in range(3):
+            author = User.objects.create_user(
+                username=f'author{i}', first_name='Имя', last_name=f'{i}')
+            Follow.objects.create(user=cls.user, author=author)
+            for _ in range(TEST_POST_COUNT):
+                Post.objects.create(
+                    author=author, group=cls.group, text='Пост в ленте')
+
+    def setUp(self):
+        cache.clear()
+        SessionStore.local.clear()
+        user_cache.clear()
+        self.client = Client()
+        self.client.force_login(FollowFeedQueriesTests.user)
+
+    def test_feed_page_query_count(self):
+        """.Проверяем число запросов страницы ленты подписок."""
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        # Сессия, пользователь и подписки в кэше: COUNT и страница постов
+        # с авторами и группами
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertContains(response, 'feed-group')
+        self.assertEqual(len(response.context['page_obj']), LIST_LIMIT)
+
+
+class ListCountsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='count-group', description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    @override_settings(JOBS_EAGER=True, PAGE_CACHE_ENABLE=False)
+    def test_counts_are_refreshed_by_jobs(self):
+        """.Проверяем обновление числа страниц задачами очереди."""
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        self.assertEqual(
+            self.client.get(url).context['page_obj'].paginator.count, 0)
+        Post.objects.bulk_create([
+            Post(author=self.author, group=self.group, text='Пост')
+            for _ in range(LIST_LIMIT)
+        ])
+        # bulk_create без сигналов: в кэше прежнее значение
+        self.assertEqual(
+            self.client.get(url).context['page_obj'].paginator.count, 0)
+        Post.objects.create(
+            author=self.author, group=self.group, text='Ещё пост')
+        paginator = self.client.get(url).context['page_obj'].paginator
+        self.assertEqual(paginator.count, LIST_LIMIT + 1)
+        self.assertEqual(paginator.num_pages, 2)
+
+    def test_count_keys_are_memcached_safe(self):
+        """.Проверяем ключи чисел постов для имён не в ASCII."""
+        User.objects.create_user(username='Автор')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            refresh_post_counts(['author:Автор'])
+            self.assertEqual(cache.get(count_key('author:Автор')), 0)
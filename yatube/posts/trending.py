@@ -0,0 +1,115 @@
+import heapq
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.pagecache import invalidate_pages
+
+from .models import Post, TrendingActivity
+
+TRENDING_KEY = 'trending'
+TRENDING_TIMEOUT = 60 * 60
+# Пересчёты при промахе кэша за это время склеиваются в одну задачу
+TRENDING_REFRESH_WINDOW = 60
+TRENDING_WINDOW = 72
+TOP_COUNT = 50
+COMMENT_WEIGHT = 1.0
+FOLLOW_WEIGHT = 2.0
+
+
+def current_hour(now=None):
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def add_activity(kind, object_id, weight, now=None):
+    """Атомарно прибавляет вес к счётчику текущего часа (UPDATE ... + w,
+    при отсутствии строки - INSERT)."""
+    bucket = TrendingActivity.objects.filter(
+        kind=kind, object_id=object_id, hour=current_hour(now))
+    if bucket.update(activity=F('activity') + weight):
+        return
+    try:
+        with transaction.atomic():
+            TrendingActivity.objects.create(
+                kind=kind, object_id=object_id, hour=current_hour(now),
+                activity=weight)
+    except IntegrityError:
+        # Строку только что создал параллельный запрос
+        bucket.update(activity=F('activity') + weight)
+
+
+def record_post_activity(post_id, group_id, weight, now=None):
+    add_activity(TrendingActivity.POST, post_id, weight, now)
+    if group_id is not None:
+        add_activity(TrendingActivity.GROUP, group_id, weight, now)
+
+
+def record_comment(comment):
+    record_post_activity(
+        comment.post_id, comment.post.group_id, COMMENT_WEIGHT)
+
+
+def record_follow(follow):
+    """Подписка засчитывается последнему посту автора и его группе."""
+    latest = Post.objects.filter(author_id=follow.author_id).order_by(
+        '-pub_date').values_list('pk', 'group_id').first()
+    if latest is not None:
+        record_post_activity(*latest, FOLLOW_WEIGHT)
+
+
+def compute_trending(now=None):
+    """Top-N постов и групп по активности с экспоненциальным затуханием.
+
+    Читаются только счётчики за последние TRENDING_WINDOW часов; вклад
+    часа уменьшается вдвое каждые TRENDING_HALF_LIFE часов.
+    """
+    now = now or timezone.now()
+    half_life = settings.TRENDING_HALF_LIFE
+    scores = defaultdict(lambda: defaultdict(float))
+    rows = TrendingActivity.objects.filter(
+        hour__gte=current_hour(now) - timedelta(hours=TRENDING_WINDOW)
+    ).values_list('kind', 'object_id', 'hour', 'activity')
+    for kind, object_id, hour, activity in rows.iterator():
+        age = (now - hour).total_seconds() / 3600
+        scores[kind][object_id] += activity * 0.5 ** (age / half_life)
+    return {
+        kind: heapq.nlargest(
+            TOP_COUNT, scores[kind], key=scores[kind].__getitem__)
+        for kind in (TrendingActivity.POST, TrendingActivity.GROUP)
+    }
+
+
+def refresh_trending(now=None):
+    """Пересчитывает рейтинг в кэш и удаляет счётчики старше окна."""
+    trending = compute_trending(now)
+    cache.set(TRENDING_KEY, trending, TRENDING_TIMEOUT)
+    invalidate_pages(['trending'])
+    TrendingActivity.objects.filter(
+        hour__lt=current_hour(now) - timedelta(hours=TRENDING_WINDOW)
+    ).delete()
+    return trending
+
+
+def get_trending():
+    """Списки id {'post': [...], 'group': [...]} по убыванию рейтинга.
+
+    Рейтинг считает периодическая задача posts.refresh_trending. При
+    промахе кэша пересчёт ставится в очередь, а до его выполнения
+    списки пусты: запрос не считает рейтинг и не чистит счётчики сам.
+    """
+    trending = cache.get(TRENDING_KEY)
+    if trending is None:
+        from .tasks import refresh_trending_lists
+
+        window = int(time.time() // TRENDING_REFRESH_WINDOW)
+        refresh_trending_lists.delay(key=f'refresh_trending:{window}')
+        # С JOBS_EAGER задача уже выполнена
+        trending = cache.get(TRENDING_KEY) or {
+            TrendingActivity.POST: [], TrendingActivity.GROUP: []}
+    return trending
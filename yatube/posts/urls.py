@@ -1,21 +1,45 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
+    path('groups/', views.group_directory, name='groups'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path(
+        'posts/<int:post_id>/history/',
+        views.post_history,
+        name='post_history'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
     path('follow', views.follow_index, name='follow_index'),
+    path('trending/', views.trending, name='trending'),
+    path('suggestions/', views.suggestions, name='suggestions'),
+    path('notifications/', views.notifications, name='notifications'),
+    path(
+        'profile/<str:username>/followers/',
+        views.profile_followers,
+        name='profile_followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.profile_following,
+        name='profile_following'
+    ),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -26,5 +50,23 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('feed/', feeds.index_rss, name='feed'),
+    path('feed/atom/', feeds.index_atom, name='feed_atom'),
+    path('group/<slug:slug>/feed/', feeds.group_rss, name='group_feed'),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.group_atom,
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.author_rss,
+        name='author_feed'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.author_atom,
+        name='author_feed_atom'
+    ),
     path('', views.index, name='index'),
 ]
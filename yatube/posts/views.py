@@ -1,30 +1,117 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.utils.http import is_safe_url
 
+from core.pagination import WindowedPaginator, get_keyset_page
+from core.ratelimit import ratelimit
+from users.cache import get_user_or_404
+
+from .counters import count_key
+from .detail import get_post_detail
+from .export import ndjson_lines, zip_chunks
+from .follows import followed_author_ids, page_author_ids
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Follow, Group, Post, PostRevision
+from .revisions import revision_text
+from .suggestions import get_suggestions
+from .trending import get_trending
+from .notifications import mark_read
+from .tasks import (make_thumbnail, notify_about_comment, notify_about_post,
+                    refresh_user_suggestions)
 
 LIST_LIMIT = 10
+PEOPLE_LIMIT = 20
+SUGGESTIONS_PREVIEW = 5
+FOLLOW_ORDERING = ('-id',)
+NOTIFICATION_ORDERING = ('-id',)
+GROUP_ORDERINGS = {
+    'activity': ('-last_activity', '-id'),
+    'posts': ('-posts_count', '-id'),
+    'title': ('title', 'id'),
+}
 
 
-def get_page_obj_paginated(request, post_list, page_list_limit):
-    paginator = Paginator(post_list, page_list_limit)
+def get_page_obj_paginated(request, post_list, page_list_limit, scope=None):
+    """Страница списка; для списков постов со `scope` число записей
+    берётся из кэша (posts.counters)."""
+    paginator = WindowedPaginator(
+        post_list, page_list_limit,
+        count_key=scope and count_key(scope))
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
-@cache_page(20, key_prefix='index_page')
+def enqueue_thumbnail(post):
+    """Превью картинки готовит воркер очереди, а не запрос."""
+    if post.image:
+        make_thumbnail.delay(
+            key=f'thumbnail:{post.pk}:{post.image.name}', post_id=post.pk)
+
+
+def redirect_back(request, username):
+    """Возврат на страницу, с которой нажали кнопку, либо в профиль."""
+    next_url = request.GET.get('next')
+    if next_url and is_safe_url(
+            next_url, allowed_hosts={request.get_host()},
+            require_https=request.is_secure()):
+        return redirect(next_url)
+    return redirect('posts:profile', username=username)
+
+
 def index(request):
     """Главная страница со всеми постами."""
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
-    post_list = Post.objects.select_related('author', 'group').all()
-    page_obj = get_page_obj_paginated(request, post_list, LIST_LIMIT)
+    post_list = Post.objects.for_list()
+    page_obj = get_page_obj_paginated(
+        request, post_list, LIST_LIMIT, scope='index')
     context = {
         'title': title,
         'page_obj': page_obj,
+        'followed_ids': followed_author_ids(
+            request.user, page_author_ids(page_obj)),
+    }
+    return render(request, template, context)
+
+
+def trending(request):
+    """Популярные посты и группы по недавней активности."""
+    template = 'posts/trending.html'
+    top = get_trending()
+    page_obj = get_page_obj_paginated(request, top['post'], LIST_LIMIT)
+    posts = Post.objects.for_list().in_bulk(
+        page_obj.object_list)
+    page_obj.object_list = [
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ]
+    groups = Group.objects.in_bulk(top['group'][:LIST_LIMIT])
+    context = {
+        'title': 'Популярное',
+        'page_obj': page_obj,
+        'groups': [
+            groups[group_id] for group_id in top['group'][:LIST_LIMIT]
+            if group_id in groups
+        ],
+        'followed_ids': followed_author_ids(
+            request.user, page_author_ids(page_obj)),
+    }
+    return render(request, template, context)
+
+
+def group_directory(request):
+    """Каталог групп со счётчиками постов, без запросов на каждую группу."""
+    template = 'posts/group_directory.html'
+    sort = request.GET.get('sort')
+    if sort not in GROUP_ORDERINGS:
+        sort = 'activity'
+    page_obj = get_keyset_page(
+        request, Group.objects.all(), GROUP_ORDERINGS[sort], LIST_LIMIT)
+    context = {
+        'title': 'Группы',
+        'page_obj': page_obj,
+        'sort': sort,
     }
     return render(request, template, context)
 
@@ -33,11 +120,14 @@ def group_posts(request, slug):
     """Страница группы со всеми постами."""
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author').all()
-    page_obj = get_page_obj_paginated(request, post_list, LIST_LIMIT)
+    post_list = group.posts.for_list()
+    page_obj = get_page_obj_paginated(
+        request, post_list, LIST_LIMIT, scope=f'group:{group.slug}')
     context = {
         'group': group,
         'page_obj': page_obj,
+        'followed_ids': followed_author_ids(
+            request.user, page_author_ids(page_obj)),
     }
     return render(request, template, context)
 
@@ -45,14 +135,12 @@ def group_posts(request, slug):
 def profile(request, username):
     """Страница пользователя с его постами."""
     template = 'posts/profile.html'
-    author = User.objects.get(username=username)
-    author_post_list = author.posts.select_related('group').all()
-    page_obj = get_page_obj_paginated(request, author_post_list, LIST_LIMIT)
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user, author=author).exists()
-    else:
-        following = False
+    author = get_user_or_404(username)
+    author_post_list = author.posts.for_list()
+    page_obj = get_page_obj_paginated(
+        request, author_post_list, LIST_LIMIT,
+        scope=f'author:{author.username}')
+    following = author.pk in followed_author_ids(request.user, [author])
     context = {
         'author': author,
         'page_obj': page_obj,
@@ -64,18 +152,47 @@ def profile(request, username):
 def post_detail(request, post_id):
     """Страница поста с полной информацией."""
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post, comments, author_posts_count = get_post_detail(post_id)
     form = CommentForm()
-    comments = post.comments.select_related('author').all()
     context = {
         'post': post,
         'form': form,
         'comments': comments,
+        'author_posts_count': author_posts_count,
+        'followed_ids': followed_author_ids(request.user, [post.author_id]),
     }
     return render(request, template, context)
 
 
 @login_required
+def post_history(request, post_id):
+    """История правок поста (автору и модераторам)."""
+    template = 'posts/post_history.html'
+    post = get_object_or_404(Post.objects.select_related('author'), pk=post_id)
+    if request.user != post.author and not request.user.is_staff:
+        return redirect('posts:post_detail', post_id)
+    revision_list = post.revisions.only('number', 'created', 'is_snapshot')
+    page_obj = get_page_obj_paginated(request, revision_list, LIST_LIMIT)
+    number = request.GET.get('version')
+    text = post.text
+    if number and number.isdigit():
+        try:
+            text = revision_text(post, int(number))
+        except PostRevision.DoesNotExist:
+            number = None
+    else:
+        number = None
+    context = {
+        'post': post,
+        'page_obj': page_obj,
+        'version': number and int(number),
+        'text': text,
+    }
+    return render(request, template, context)
+
+
+@login_required
+@ratelimit('post')
 def post_create(request):
     """Форма создания нового поста."""
     template = 'posts/create_post.html'
@@ -85,6 +202,9 @@ def post_create(request):
             new_post = form.save(commit=False)
             new_post.author = request.user
             new_post.save()
+            enqueue_thumbnail(new_post)
+            notify_about_post.delay(
+                key=f'notify-post:{new_post.pk}', post_id=new_post.pk)
             return redirect('posts:profile', request.user.username)
         return render(request, template, {'form': form})
     form = PostForm()
@@ -110,7 +230,7 @@ def post_edit(request, post_id):
             files=request.FILES or None,
             instance=post)
         if form.is_valid():
-            form.save()
+            enqueue_thumbnail(form.save())
             return redirect('posts:post_detail', post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id)
@@ -118,6 +238,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('comment')
 def add_comment(request, post_id):
     """Добавление комментария в POST запросе."""
     form = CommentForm(request.POST or None)
@@ -126,6 +247,7 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = Post.objects.get(id=post_id)
         comment.save()
+        notify_about_comment.delay(comment_id=comment.pk)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -134,35 +256,127 @@ def follow_index(request):
     """Лента постов авторов, на которых подписан пользователь."""
     template = 'posts/follow.html'
     title = 'Лента постов избранных авторов'
-    follows = request.user.follower.all().values_list('author')
-    authors = User.objects.filter(id__in=follows)
-    post_list = Post.objects.filter(author__in=authors)
+    post_list = Post.objects.feed_for(request.user)
     page_obj = get_page_obj_paginated(request, post_list, LIST_LIMIT)
+    suggestions, _ = get_suggestions(request.user, limit=SUGGESTIONS_PREVIEW)
     context = {
         'title': title,
         'page_obj': page_obj,
+        'suggestions': suggestions,
+    }
+    return render(request, template, context)
+
+
+def profile_followers(request, username):
+    """Подписчики пользователя."""
+    template = 'posts/follow_list.html'
+    author = get_user_or_404(username)
+    follows = author.following.select_related('user')
+    page_obj = get_keyset_page(request, follows, FOLLOW_ORDERING, PEOPLE_LIMIT)
+    context = {
+        'title': f'Подписчики пользователя {author.username}',
+        'author': author,
+        'page_obj': page_obj,
+        'people': [follow.user for follow in page_obj],
+    }
+    return render(request, template, context)
+
+
+def profile_following(request, username):
+    """Авторы, на которых подписан пользователь."""
+    template = 'posts/follow_list.html'
+    author = get_user_or_404(username)
+    follows = author.follower.select_related('author')
+    page_obj = get_keyset_page(request, follows, FOLLOW_ORDERING, PEOPLE_LIMIT)
+    context = {
+        'title': f'Подписки пользователя {author.username}',
+        'author': author,
+        'page_obj': page_obj,
+        'people': [follow.author for follow in page_obj],
     }
     return render(request, template, context)
 
 
 @login_required
+def suggestions(request):
+    """Рекомендации «возможно, вы знакомы» (друзья друзей)."""
+    template = 'posts/suggestions.html'
+    try:
+        after = int(request.GET.get('after', ''))
+    except ValueError:
+        after = None
+    people, next_after = get_suggestions(
+        request.user, after=after, limit=PEOPLE_LIMIT)
+    context = {
+        'title': 'Возможно, вы знакомы',
+        'people': people,
+        'next_after': next_after,
+        'is_first': after is None,
+    }
+    return render(request, template, context)
+
+
+@login_required
+def notifications(request):
+    """Уведомления пользователя; при просмотре отмечаются прочитанными."""
+    template = 'posts/notifications.html'
+    notification_list = request.user.notifications.filter(
+        post__is_deleted=False).select_related('actor', 'post')
+    page_obj = get_keyset_page(
+        request, notification_list, NOTIFICATION_ORDERING, LIST_LIMIT)
+    if page_obj.is_first:
+        mark_read(request.user)
+    context = {
+        'title': 'Уведомления',
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@login_required
+def profile_export(request, username):
+    """Выгрузка своих постов, комментариев и подписок.
+
+    По умолчанию NDJSON, с ?format=zip - архив вместе с картинками.
+    Ответ потоковый: данные читаются из БД кусками по мере отправки.
+    """
+    author = get_user_or_404(username)
+    if author != request.user and not request.user.is_staff:
+        return redirect('posts:profile', username=username)
+    if request.GET.get('format') == 'zip':
+        response = StreamingHttpResponse(
+            zip_chunks(author), content_type='application/zip')
+        filename = f'{author.username}.zip'
+    else:
+        response = StreamingHttpResponse(
+            ndjson_lines(author), content_type='application/x-ndjson')
+        filename = f'{author.username}.ndjson'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@ratelimit('follow', methods=None)
 def profile_follow(request, username):
     """Подписка на автора."""
-    author = User.objects.get(username=username)
+    author = get_user_or_404(username)
     if author == request.user:
         return redirect('posts:profile', username=username)
     following = Follow.objects.filter(
         user=request.user, author=author).exists()
     if not following:
         Follow.objects.create(user=request.user, author=author)
-    return redirect('posts:profile', username=username)
+        refresh_user_suggestions.delay(user_id=request.user.pk)
+    return redirect_back(request, username)
 
 
 @login_required
 def profile_unfollow(request, username):
     """Дизлайк, отписка от автора."""
-    author = User.objects.get(username=username)
-    follow_object = Follow.objects.get(user=request.user, author=author)
-    if follow_object:
-        follow_object.delete()
-    return redirect('posts:profile', username=username)
+    author = get_user_or_404(username)
+    # Повторная отписка (двойной клик, устаревшая страница) - не ошибка
+    deleted, _ = Follow.objects.filter(
+        user=request.user, author=author).delete()
+    if deleted:
+        refresh_user_suggestions.delay(user_id=request.user.pk)
+    return redirect_back(request, username)
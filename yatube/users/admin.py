@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts.purge import soft_delete_user
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    """Удаление пользователя деактивирует его и скрывает контент сразу,
+    а сами записи удаляет очередь пачками (posts.purge)."""
+
+    def delete_model(self, request, obj):
+        soft_delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            soft_delete_user(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
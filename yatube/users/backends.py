@@ -0,0 +1,14 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import User, get_user_by_id
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, загружающий пользователя сессии из кэша процесса."""
+
+    def get_user(self, user_id):
+        try:
+            user = get_user_by_id(user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from core.localcache import LocalCache
+
+User = get_user_model()
+
+# Значения полей, а не сами объекты: каждый запрос получает свой экземпляр
+by_id = LocalCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT)
+by_username = LocalCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT)
+
+
+def field_names():
+    return [field.attname for field in User._meta.concrete_fields]
+
+
+def remember(user):
+    by_id.set(user.pk, tuple(getattr(user, name) for name in field_names()))
+    by_username.set(user.get_username(), user.pk)
+    return user
+
+
+def cached_user(user_id):
+    values = by_id.get(user_id)
+    if values is None:
+        return None
+    return User.from_db('default', field_names(), values)
+
+
+def get_user_by_id(user_id):
+    """Пользователь по id из кэша процесса; User.DoesNotExist, если нет.
+
+    Кэш не получает инвалидаций из других процессов: там изменения
+    пользователя видны не позже чем через USER_CACHE_TIMEOUT секунд.
+    """
+    user = cached_user(user_id)
+    if user is None:
+        user = remember(User._default_manager.get(pk=user_id))
+    return user
+
+
+def get_user_by_username(username):
+    user_id = by_username.get(username)
+    user = cached_user(user_id) if user_id is not None else None
+    # Имя могло смениться: запись по старому имени уже не годится
+    if user is None or user.get_username() != username:
+        user = remember(User._default_manager.get_by_natural_key(username))
+    return user
+
+
+def get_user_or_404(username):
+    try:
+        return get_user_by_username(username)
+    except User.DoesNotExist:
+        raise Http404(f'Пользователь {username} не найден')
+
+
+def forget_user(user):
+    by_id.delete(user.pk)
+    by_username.delete(user.get_username())
+
+
+def clear():
+    by_id.clear()
+    by_username.clear()
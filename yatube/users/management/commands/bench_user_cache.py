@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.follows import forget_following
+from posts.models import Post
+from users import cache as user_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число запросов к БД на типичных страницах для '
+        'вошедшего пользователя без кэша пользователей и с ним.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def request_urls(self, post):
+        author = post.author.username
+        return [
+            reverse('posts:index'),
+            reverse('posts:profile', args=(author,)),
+            reverse('posts:post_detail', args=(post.pk,)),
+            reverse('posts:profile_followers', args=(author,)),
+            reverse('posts:profile_follow', args=(author,)),
+            reverse('posts:profile_unfollow', args=(author,)),
+        ]
+
+    def count_queries(self, client, urls, repeat):
+        # Первый проход прогревает кэши, считаются следующие
+        for url in urls:
+            client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                for url in urls:
+                    client.get(url)
+        return len(queries)
+
+    def compare(self, client, urls, repeat):
+        caches = (user_cache.by_id, user_cache.by_username)
+        sizes = [local.maxsize for local in caches]
+        try:
+            for local in caches:
+                local.maxsize = 0
+            user_cache.clear()
+            without_cache = self.count_queries(client, urls, repeat)
+        finally:
+            for local, size in zip(caches, sizes):
+                local.maxsize = size
+        return without_cache, self.count_queries(client, urls, repeat)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        post = Post.objects.select_related('author').first()
+        if post is None:
+            raise CommandError('Нужен хотя бы один пост.')
+        reader = post.author.__class__.objects.exclude(
+            pk=post.author_id).first() or post.author
+        urls = self.request_urls(post)
+        # Подписка и отписка пишут в БД: всё откатывается в конце
+        with transaction.atomic():
+            client = Client()
+            client.force_login(reader)
+            without_cache, with_cache = self.compare(client, urls, repeat)
+            transaction.set_rollback(True)
+        # Кэш подписок мог запомнить откаченное состояние
+        forget_following(reader.pk)
+        requests = repeat * len(urls)
+        self.stdout.write(
+            f'Запросов страниц: {requests}\n'
+            f'Без кэша пользователей: {without_cache} запросов к БД '
+            f'({without_cache / requests:.2f} на страницу)\n'
+            f'С кэшем пользователей:  {with_cache} запросов к БД '
+            f'({with_cache / requests:.2f} на страницу)\n'
+            f'Сэкономлено: {without_cache - with_cache}'
+        )
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users import cache as user_cache
+from users.backends import CachedModelBackend
+
+User = get_user_model()
+
+
+class UserCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        user_cache.clear()
+
+    def test_cached_user_is_read_without_queries(self):
+        """.Проверяем, что повторный поиск пользователя не идёт в БД."""
+        user_cache.get_user_by_id(self.user.pk)
+        with self.assertNumQueries(0):
+            by_id = user_cache.get_user_by_id(self.user.pk)
+            by_name = user_cache.get_user_by_username('reader')
+        self.assertEqual(by_id, self.user)
+        self.assertEqual(by_name.username, 'reader')
+        self.assertIsNot(by_id, by_name)
+
+    def test_saved_user_is_reloaded(self):
+        """.Проверяем, что сохранение пользователя сбрасывает кэш."""
+        user_cache.get_user_by_username('reader')
+        self.user.first_name = 'Читатель'
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(
+            user_cache.get_user_by_id(self.user.pk).first_name, 'Читатель')
+        with self.assertRaises(User.DoesNotExist):
+            user_cache.get_user_by_username('reader')
+
+    def test_inactive_user_is_not_authenticated(self):
+        """.Проверяем, что бэкенд не отдаёт неактивного пользователя."""
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(self.user.pk), self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user_cache.clear()
+        self.assertIsNone(backend.get_user(self.user.pk))
+        self.assertIsNone(backend.get_user(self.user.pk + 100))
+
+    def test_logged_in_requests_reuse_cached_user(self):
+        """.Проверяем, что пользователь сессии читается из БД один раз."""
+        self.client.force_login(self.user)
+        url = reverse('posts:profile', args=('reader',))
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any(
+            User._meta.db_table in query['sql']
+            and 'WHERE' in query['sql']
+            and '"auth_user"."id" =' in query['sql']
+            for query in queries
+        ))
+
+    def test_sessions_of_model_backend_stay_valid(self):
+        """.Проверяем, что сессии, созданные до смены бэкенда, действуют."""
+        self.client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 200)
@@ -1,8 +1,11 @@
 import os
 
-from dotenv import load_dotenv
+# В production переменные окружения задаются снаружи, и python-dotenv
+# не нужен (см. settings_production.py)
+if os.getenv('DJANGO_DOTENV', 'True') == 'True':
+    from dotenv import load_dotenv
 
-load_dotenv()
+    load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -19,6 +22,14 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+DEBUG_APPS = [
+    'debug_toolbar',
+]
+
+DEBUG_MIDDLEWARE = [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -30,20 +41,21 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'jobs.apps.JobsConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
-]
+] + DEBUG_APPS
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.pagecache.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-]
+] + DEBUG_MIDDLEWARE
 
 INTERNAL_IPS = [
     '127.0.0.1',
@@ -53,11 +65,19 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+# В production шаблоны разбираются один раз на процесс (cached.Loader),
+# а при старте WSGI-приложения заранее загружаются все шаблоны проекта
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', str(not DEBUG)) == 'True'
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', str(TEMPLATE_CACHE)) == 'True'
+# Перед fork-ом (gunicorn --preload) заморозить объекты в gc, чтобы сборщик
+# мусора не трогал страницы памяти, разделяемые воркерами (copy-on-write)
+GC_FREEZE = os.getenv('GC_FREEZE', 'False') == 'True'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': not TEMPLATE_CACHE,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -65,10 +85,22 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
 ]
+if TEMPLATE_CACHE:
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    # debug_toolbar требует APP_DIRS=True (debug_toolbar.W006) и нужен
+    # только при разработке, где шаблоны не кэшируются
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEBUG_APPS]
+    MIDDLEWARE = [item for item in MIDDLEWARE if item not in DEBUG_MIDDLEWARE]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
@@ -77,10 +109,25 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Тестовая БД в файле: в общей in-memory БД SQLite параллельные
+        # писатели сразу получают «table is locked», а не ждут блокировку,
+        # и тесты конкурентной записи (core.tests) невозможны
+        'TEST': {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')},
     }
 }
 
 
+# Пользователь сессии загружается из кэша процесса (users.cache), записи
+# живут USER_CACHE_TIMEOUT секунд и сбрасываются при сохранении User.
+# ModelBackend остаётся в списке: по его пути, записанному в старых
+# сессиях, пользователи остаются в системе
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_SIZE = 10000
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', 30))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,8 +157,12 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Карта сайта собирается командой build_sitemaps и отдаётся как статика
+SITEMAP_URL = '/sitemaps/'
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -120,10 +171,84 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Адрес сайта для ссылок в письмах
+SITE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
+NOTIFICATIONS_BATCH_SIZE = 500
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+# Сессии: общий кэш + БД (cached_db) и кэш в памяти процесса на
+# SESSION_LOCAL_CACHE_TIMEOUT секунд (0 - без него). Можно переключить
+# на django.contrib.sessions.backends.signed_cookies - совсем без БД
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'core.sessions')
+SESSION_LOCAL_CACHE_SIZE = 10000
+SESSION_LOCAL_CACHE_TIMEOUT = int(
+    os.getenv('SESSION_LOCAL_CACHE_TIMEOUT', 5))
+SESSION_CLEANUP_CHUNK_SIZE = 1000
+
+# Ограничение частоты записи (core.ratelimit): запросов за секунду (s),
+# минуту (m), час (h) или сутки (d) на пользователя, для анонимов - на IP
+RATELIMIT_ENABLE = os.getenv('RATELIMIT_ENABLE', 'True') == 'True'
+# Где хранятся счётчики: 'db' (RateLimitCounter, UPDATE ... + 1) или
+# 'cache' - только для общего кэша с атомарным incr (memcached, redis)
+RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'db')
+RATELIMIT_CLEANUP_CHUNK_SIZE = 1000
+RATELIMITS = {
+    'post': '10/m',
+    'comment': '20/m',
+    'follow': '60/m',
+}
+
+# Кэш общий для веб-воркеров, воркеров очереди и cron-команд должен быть
+# разделяемым (см. settings_production.py); locmem подходит только для dev
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
+
+# Кэш страниц для анонимов (core.pagecache): имя URL -> семейство страниц,
+# которое сбрасывается сигналами записи (posts.signals)
+PAGE_CACHE_ENABLE = os.getenv('PAGE_CACHE_ENABLE', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = 60 * 10
+PAGE_CACHE_QUERY_PARAMS = ('page', 'after', 'sort')
+PAGE_CACHE_FAMILIES = {
+    'posts:index': 'index',
+    'posts:group_list': 'group:{slug}',
+    'posts:profile': 'author:{username}',
+    'posts:post_detail': 'post:{post_id}',
+    'posts:groups': 'groups',
+    'posts:trending': 'trending',
+    'about:author': 'about',
+    'about:tech': 'about',
+}
+
+# Очередь задач (jobs): побочные эффекты запросов выполняет manage.py
+# run_workers. JOBS_EAGER=True выполняет задачи сразу, без очереди.
+JOBS_EAGER = os.getenv('JOBS_EAGER', 'False') == 'True'
+JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', 2))
+JOBS_LOCK_TIMEOUT = 60 * 10
+JOBS_KEEP_DONE = 60 * 60 * 24 * 7
+# Периодические задачи: имя задачи -> интервал в секундах (не чаще, чем
+# раз в минуту - так часто run_workers выполняет обслуживание)
+JOBS_PERIODIC = {
+    'posts.refresh_trending': 60 * 5,
+    'core.cleanup_sessions': 60 * 60,
+    'core.cleanup_ratelimits': 60 * 60,
+    'posts.refresh_counts': 60 * 10,
+    'posts.purge_deleted': 60 * 60,
+}
+# Посты и комментарии удаляются пометкой, физически - задачей очереди
+# пачками по PURGE_CHUNK_SIZE записей
+PURGE_CHUNK_SIZE = 500
+
+# Постраничный вывод: номера страниц вокруг текущей, предел глубины
+# (дальние OFFSET дороги) и срок хранения числа записей списка в кэше
+PAGINATOR_WINDOW = 3
+PAGINATOR_MAX_PAGES = 500
+PAGINATOR_COUNT_TIMEOUT = 60 * 60
+
+# Вкладка «Популярное»: за сколько часов вклад активности падает вдвое
+TRENDING_HALF_LIFE = 12
@@ -0,0 +1,54 @@
+"""Профиль настроек для production.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_production - без отладочных
+приложений и middleware, с кэшированием и прогревом шаблонов до fork-а
+воркеров.
+"""
+import os
+from copy import deepcopy
+
+os.environ.setdefault('DJANGO_DOTENV', 'False')
+
+from .settings import *  # noqa: E402,F401,F403
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS  # noqa: F405
+    if app not in DEBUG_APPS  # noqa: F405
+]
+MIDDLEWARE = [
+    item for item in MIDDLEWARE  # noqa: F405
+    if item not in DEBUG_MIDDLEWARE  # noqa: F405
+]
+
+TEMPLATE_CACHE = True
+TEMPLATE_WARMUP = True
+GC_FREEZE = True
+
+TEMPLATES = deepcopy(TEMPLATES)  # noqa: F405
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+    if processor != 'django.template.context_processors.debug'
+]
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# collectstatic пишет имена с хэшем и сжатые копии .gz/.br
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache')),  # noqa: F405
+    }
+}
@@ -19,3 +19,6 @@ if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+    urlpatterns += static(
+        settings.SITEMAP_URL, document_root=settings.SITEMAP_ROOT
+    )